@@ -0,0 +1,322 @@
+# encoding: utf-8
+
+"""Microbenchmarks of the parsing engine.
+
+Measures the time per call (the best of several `timeit` runs) and the memory allocated by a single call (the peak,
+and the amount retained, as traced by `tracemalloc`) of argument processing, expansion, specification building, help
+rendering, completion, and complete invocations, across varying option counts, argument list lengths, nesting depths,
+command tree sizes, and docstring sizes.  The examples beneath `example/` serve as additional, realistic fixtures.
+
+	python bench/engine.py [--repeat N] [SUBSTRING...]
+
+Only benchmarks whose names contain one of the given substrings are run.  Requires Python 3.4 or later.
+"""
+
+from __future__ import unicode_literals, print_function
+
+import os
+import ast
+import sys
+import atexit
+import shutil
+import timeit
+import tempfile
+import tracemalloc
+
+from marrow.script import annotate
+from marrow.script.core import Parser, Specification, Cursor
+
+
+here = os.path.dirname(os.path.abspath(__file__))
+examples = os.path.join(os.path.dirname(here), 'example')
+
+
+# Synthetic fixtures.
+
+def function(options, positional=0, varargs=False, doc=1):
+	"""Construct a function accepting the given number of positional arguments and keyword options."""
+	
+	names = ["arg{0}".format(i) for i in range(positional)]
+	names.extend("option_{0}={1!r}".format(i, (0, "", False)[i % 3]) for i in range(options))
+	if varargs: names.append("*items")
+	
+	source = "def command({0}):\n\t{1!r}\n\treturn 0\n".format(", ".join(names), docstring(doc))
+	namespace = dict()
+	exec(source, namespace)
+	
+	return namespace['command']
+
+
+def nested(depth):
+	"""Construct a chain of class commands of the given depth, each exposing the next as `sub`, ending with `run`."""
+	
+	class Leaf(object):
+		def __init__(self, verbose=False): pass
+		def run(self, name="world"): return 0
+	
+	current = Leaf
+	
+	for i in range(depth - 1):
+		current = type(str("Level{0}".format(i)), (object, ), dict(
+				__init__ = lambda self, verbose=False: None,
+				sub = current,
+			))
+	
+	return current
+
+
+def tree(commands, options):
+	"""Construct a class command exposing the given number of sub-commands, each accepting the given number of options."""
+	
+	members = dict(__init__=lambda self, verbose=False: None)
+	
+	for i in range(commands):
+		member = members["command{0}".format(i)] = function(options, 1)
+		member.__module__ = __name__  # Fingerprinted by the source of this module when persisted.
+	
+	return type(str("Tree{0}x{1}".format(commands, options)), (object, ), members)
+
+
+def scratch():
+	"""Direct persisted descriptions to a temporary cache directory, removed on exit."""
+	
+	if 'XDG_CACHE_HOME' not in scratch.__dict__:
+		scratch.XDG_CACHE_HOME = os.environ['XDG_CACHE_HOME'] = tempfile.mkdtemp()
+		atexit.register(shutil.rmtree, scratch.XDG_CACHE_HOME, True)
+
+
+def docstring(paragraphs):
+	"""Return a docstring consisting of a summary and the given number of paragraphs of description."""
+	
+	paragraph = "Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do eiusmod tempor incididunt ut " \
+			"labore et dolore magna aliqua.  Ut enim ad minim veniam, quis nostrud exercitation ullamco."
+	
+	return "\n\n".join(["A synthetic command."] + [paragraph] * paragraphs)
+
+
+def example(path, name):
+	"""Load a named command from an example script, without running the script itself.
+	
+	Only the imports (including those guarded by `try`), assignments, and definitions at the top level of the script
+	are executed; statements failing to import (such as those of interfaces not yet available) are skipped.
+	"""
+	
+	path = os.path.join(examples, path)
+	
+	with open(path) as fh:
+		tree = ast.parse(fh.read(), path)
+	
+	namespace = dict(__name__='example', __file__=path)
+	
+	for node in tree.body:
+		if not isinstance(node, (ast.Import, ast.ImportFrom, ast.Try, ast.Assign, ast.FunctionDef, ast.ClassDef)):
+			continue
+		
+		try:
+			exec(compile(ast.Module([node], []) if sys.version_info >= (3, 8) else ast.Module([node]), path, 'exec'), namespace)
+		except ImportError:
+			continue
+	
+	return namespace.get(name)
+
+
+# Benchmarks.
+
+def invocation(command, argv):
+	parser = Parser(command)
+	null = open(os.devnull, 'w')
+	
+	def call():
+		stdout, sys.stdout = sys.stdout, null  # Discard the output of example commands.
+		
+		try:
+			return parser(argv)
+		finally:
+			sys.stdout = stdout
+	
+	return call
+
+
+def cold(command, argv, persist=False):
+	"""As invocation, but discarding compiled specifications first, as a fresh process would lack them."""
+	
+	if persist: scratch()
+	
+	call = invocation(command, argv)
+	
+	def fresh():
+		Parser.cache.clear()
+		return call()
+	
+	return fresh
+
+
+def completion(command, persist=False):
+	"""Generation of a completion script from a fresh process, describing the tree, or loading its description."""
+	
+	from marrow.script.complete import generate
+	
+	if persist:
+		scratch()
+		generate(Parser(command, persist=True))  # Described and stored once, beforehand.
+	
+	def call():
+		Parser.cache.clear()
+		return generate(Parser(command, persist=persist), 'bash', 'tree')
+	
+	return call
+
+
+def specification(command):
+	return lambda: Specification(command)
+
+
+def lookup(command):
+	parser = Parser(command)
+	return lambda: parser.specification(command)
+
+
+def expansion(command, arg):
+	parser = Parser(command)
+	spec = parser.compile(command)
+	return lambda: parser.expand(arg, spec)
+
+
+def arguments(command, argv):
+	parser = Parser(command)
+	spec = parser.compile(command)
+	return lambda: parser.arguments(Cursor(argv), spec)
+
+
+def rendering(command, argv=()):
+	parser = Parser(command)
+	parser.stack = [parser.compile(command)]
+	
+	for name in argv:  # Descend through sub-commands, as execute would.
+		command = getattr(command, name)
+		parser.stack.append(parser.compile(command, method=not isinstance(command, type)))
+	
+	return lambda: parser.render(79)
+
+
+def schema(command, apply=False):
+	from marrow.script.schema import Specification
+	
+	if not apply:
+		def build():
+			command.__dict__.pop('__script_spec__', None)
+			return Specification.from_object(command)
+		
+		return build
+	
+	instance = Specification.from_object(command)()
+	return instance.apply
+
+
+def benchmarks():
+	"""Yield the name of each benchmark and a callable returning the callable to measure."""
+	
+	for count in (1, 10, 50):
+		yield "call/options={0}".format(count), lambda count=count: invocation(function(count), ['--option-0=1'])
+		yield "specification/options={0}".format(count), lambda count=count: specification(function(count))
+		yield "arguments/options={0}".format(count), lambda count=count: arguments(function(count),
+				["--option-{0}={0}".format(i) for i in range(0, count, 3)])
+	
+	for length in (10, 1000, 10000):
+		yield "call/argv={0}".format(length), lambda length=length: invocation(function(2, 1, True), ['x'] * length)
+		yield "arguments/argv={0}".format(length), lambda length=length: arguments(function(2, 1, True), ['x'] * length)
+	
+	yield "call/numeric=10000", lambda: invocation(annotate(items=float)(function(0, 0, True)),
+			[str(i * 0.5) for i in range(10000)])
+	
+	for depth in (1, 5, 20):
+		yield "call/depth={0}".format(depth), lambda depth=depth: invocation(nested(depth), ['-v', 'sub'] * (depth - 1) +
+				['run', '--name=x'])
+	
+	for commands, options in ((5, 5), (30, 10)):
+		name = "tree={0}x{1}".format(commands, options)
+		argv = ['-v', 'command1', '--option-1=x']
+		
+		yield "call/" + name, lambda c=commands, o=options: cold(tree(c, o), argv)
+		yield "call/" + name + "/persist", lambda c=commands, o=options: cold(tree(c, o), argv, True)
+		yield "complete/" + name, lambda c=commands, o=options: completion(tree(c, o))
+		yield "complete/" + name + "/persist", lambda c=commands, o=options: completion(tree(c, o), True)
+	
+	for size in (1, 10, 100):
+		yield "help/docstring={0}".format(size), lambda size=size: rendering(function(10, doc=size))
+	
+	yield "specification/cached", lambda: lookup(function(10))
+	yield "expand/long", lambda: expansion(function(3), '--option-1=value')
+	yield "expand/short", lambda: expansion(function(3), '-oO')
+	yield "expand/positional", lambda: expansion(function(3), 'value')
+	
+	# Realistic fixtures.
+	catalog = example('simple/ls.py', 'catalog')
+	service = example('simple/service.py', 'Service')
+	ultima = example('simple/ultima.py', 'ultima')
+	naval = example('naval/naval.py', 'NavalFate')
+	validation = example('validation/validation.py', 'validation')
+	url = example('validation/validation.py', 'url')
+	
+	yield "example/ls/arguments", lambda: arguments(catalog, ['-a', '--verbose', '.'])
+	yield "example/ls/help", lambda: rendering(catalog)
+	yield "example/service/help", lambda: rendering(service)
+	yield "example/service/arguments", lambda: arguments(service, ['-v', 'start'])
+	yield "example/ultima/call", lambda: invocation(ultima, ['req', '-n', 'Bob', '-s', '--age=27'])
+	yield "example/naval/help", lambda: rendering(naval, ['ship'])
+	yield "example/naval/specification", lambda: specification(naval.ship.move)
+	yield "example/validation/schema", lambda: schema(validation)
+	yield "example/validation/apply", lambda: schema(validation, True)
+	yield "example/validation/pure", lambda: invocation(annotate(items=url)(function(0, 0, True)),
+			["http://example.com/{0}".format(i % 10) for i in range(10000)])
+
+
+def measure(fn, repeat):
+	"""Return the best time per call, and the peak and retained bytes allocated by a single call, of the callable."""
+	
+	timer = timeit.Timer(fn)
+	number = max(1, timer.autorange()[0] // 5) if hasattr(timer, 'autorange') else 1000
+	best = min(timer.repeat(repeat, number)) / number
+	
+	tracemalloc.start()
+	
+	try:
+		before = tracemalloc.get_traced_memory()[0]
+		result = fn()
+		current, peak = tracemalloc.get_traced_memory()
+	finally:
+		tracemalloc.stop()
+	
+	del result
+	
+	return best, peak - before, current - before
+
+
+def main(argv=None):
+	argv = sys.argv[1:] if argv is None else argv
+	repeat = 5
+	
+	if argv[:1] == ['--repeat']:
+		repeat, argv = int(argv[1]), argv[2:]
+	
+	print("{0:<32} {1:>12} {2:>12} {3:>12}".format("Benchmark", "Time (µs)", "Peak (B)", "Retained (B)"))
+	
+	for name, setup in benchmarks():
+		if argv and not any(i in name for i in argv):
+			continue
+		
+		try:
+			fn = setup()
+		except Exception as e:  # e.g. optional dependencies or interfaces unavailable in this environment.
+			print("{0:<32} skipped: {1!r}".format(name, e))
+			continue
+		
+		best, peak, retained = measure(fn, repeat)
+		print("{0:<32} {1:>12.2f} {2:>12} {3:>12}".format(name, best * 1e6, peak, retained))
+		sys.stdout.flush()
+	
+	return 0
+
+
+if __name__ == '__main__':
+	sys.exit(main())
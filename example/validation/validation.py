@@ -3,13 +3,15 @@
 from __future__ import unicode_literals, print_function
 
 try:
-	from urllib.parser import urlparse
+	from urllib.parse import urlparse
 except ImportError:
 	from urlparse import urlparse
 
 from marrow.script import Script
+from marrow.script import pure
 
 
+@pure
 def count(value):
 	value = int(value)
 	
@@ -19,6 +21,7 @@ def count(value):
 	return value
 
 
+@pure(size=256)
 def url(value):
 	if not isinstance(value, tuple):
 		value = urlparse(value)
@@ -3,9 +3,12 @@
 import sys
 
 from marrow.script.core import Parser
+from marrow.script.lazy import Lazy
+from marrow.script.plugin import mount
+from marrow.script.typecast import pure
 
 
-__all__ = ['Parser', 'execute', 'script', 'annotate', 'describe', 'short']
+__all__ = ['Parser', 'Lazy', 'mount', 'execute', 'execute_batch', 'execute_server', 'script', 'annotate', 'describe', 'short', 'callbacks', 'stream', 'parallel', 'formatted', 'pure']
 
 
 
@@ -13,6 +16,16 @@ def execute(obj): # pragma: no cover
     sys.exit(Parser(obj)(sys.argv[1:]))
 
 
+def execute_batch(obj, stream=None, json=False): # pragma: no cover
+    from marrow.script.batch import batch
+    sys.exit(batch(Parser(obj), sys.stdin if stream is None else stream, json=json))
+
+
+def execute_server(obj, path, fork=False): # pragma: no cover
+    from marrow.script.server import serve
+    sys.exit(serve(Parser(obj), path, fork=fork))
+
+
 
 def base(attr):
     def decorator(**kw):
@@ -34,3 +47,6 @@ annotate = base('_cmd_arg_type')
 describe = base('_cmd_arg_doc')
 short = base('_cmd_arg_abbrev')
 callbacks = base('_cmd_arg_callback')
+stream = base('_cmd_arg_stream')
+parallel = base('_cmd_parallel')
+formatted = base('_cmd_format')
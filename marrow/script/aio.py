@@ -0,0 +1,100 @@
+# encoding: utf-8
+
+"""Execution of asynchronous commands upon an event loop managed for the duration of a single invocation.
+
+Imported only once a command returns an awaitable.  Requires Python 3.5 or later.
+"""
+
+from __future__ import unicode_literals
+
+import signal
+import asyncio
+
+from .exc import ExitException
+
+
+__all__ = ['Runner']
+
+
+class Runner(object):
+	"""Run awaitables to completion upon a lazily created event loop, shared by every level of a command.
+	
+	The loop is created using the given factory (`asyncio.new_event_loop` by default; pass `uvloop.new_event_loop` or
+	similar to substitute another implementation) and closed by `close`.  An interrupt (SIGINT) cancels the running
+	task, allowing it to clean up, then exits with the conventional status of 130.
+	"""
+	
+	__slots__ = ('factory', 'loop')
+	
+	def __init__(self, factory=None):
+		self.factory = factory or asyncio.new_event_loop
+		self.loop = None
+	
+	def run(self, awaitable):
+		"""Run the given awaitable to completion, returning its result."""
+		
+		if self.loop is None:
+			self.loop = self.factory()
+			asyncio.set_event_loop(self.loop)
+		
+		loop = self.loop
+		task = asyncio.ensure_future(awaitable, loop=loop)
+		interrupted = []
+		
+		def interrupt():
+			interrupted.append(True)
+			task.cancel()
+		
+		try:
+			loop.add_signal_handler(signal.SIGINT, interrupt)
+		except (NotImplementedError, RuntimeError, ValueError):  # Not the main thread, or not supported by the loop.
+			watching = False
+		else:
+			watching = True
+		
+		try:
+			return loop.run_until_complete(task)
+		
+		except asyncio.CancelledError:
+			if not interrupted: raise
+			raise ExitException(128 + signal.SIGINT)
+		
+		except KeyboardInterrupt:  # Delivered directly, as the handler could not be installed.
+			task.cancel()
+			
+			try:
+				loop.run_until_complete(task)
+			except (asyncio.CancelledError, Exception):
+				pass
+			
+			raise
+		
+		finally:
+			if watching:
+				loop.remove_signal_handler(signal.SIGINT)
+	
+	def close(self):
+		"""Cancel any outstanding tasks, finalize asynchronous generators, and close the loop, if one was created."""
+		
+		loop, self.loop = self.loop, None
+		
+		if loop is None:
+			return
+		
+		try:
+			pending = [i for i in asyncio.all_tasks(loop) if not i.done()]
+			
+			for task in pending:
+				task.cancel()
+			
+			if pending:
+				loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+			
+			loop.run_until_complete(loop.shutdown_asyncgens())
+			
+			if hasattr(loop, 'shutdown_default_executor'):
+				loop.run_until_complete(loop.shutdown_default_executor())
+		
+		finally:
+			asyncio.set_event_loop(None)
+			loop.close()
@@ -0,0 +1,103 @@
+# encoding: utf-8
+
+"""Execution of many command lines within a single interpreter."""
+
+from __future__ import unicode_literals, print_function
+
+import os
+import sys
+import shlex
+
+from json import dumps
+
+try:
+	from io import StringIO
+except ImportError:  # pragma: no cover
+	from cStringIO import StringIO
+
+
+__all__ = ['batch']
+
+
+def invoke(parser, argv):
+	"""Invoke the parser, returning an exit status even for exits and failures escaping it."""
+	
+	try:
+		return parser(argv)
+	
+	except SystemExit as e:
+		return e.code
+	
+	except Exception as e:
+		print("Uncaught exception:", repr(e), file=sys.stderr)
+		return os.EX_SOFTWARE
+
+
+def batch(parser, stream, output=None, json=False):
+	"""Execute each line of the given stream as a separate invocation of the parser.
+	
+	Each line is split using shell syntax; blank lines and comments are skipped.  Normally the output of each
+	invocation passes through as it is produced and a non-zero exit status is reported on standard error.  If `json`
+	is truthy, the output of each invocation is captured and a JSON object per line is written to `output` (standard
+	output by default) with the line number, arguments, exit status, and captured output.
+	
+	Lines which can not be split, such as those with unbalanced quotes, fail with an exit status of `EX_USAGE`.
+	
+	Returns zero if every line succeeded, one otherwise.
+	"""
+	
+	failed = False
+	
+	for number, line in enumerate(stream, 1):
+		try:
+			argv = shlex.split(line, comments=True)
+		
+		except ValueError as e:
+			failed = True
+			
+			if not json:
+				print("Line ", number, ": ", e, sep="", file=sys.stderr)
+				continue
+			
+			print(dumps(dict(
+					line = number,
+					argv = None,
+					status = os.EX_USAGE,
+					stdout = "",
+					stderr = "Malformed line: {0}\n".format(e),
+				), sort_keys=True), file=output or sys.stdout)
+			
+			continue
+		
+		if not argv: continue
+		
+		if not json:
+			status = invoke(parser, argv) or 0
+			
+			if status:
+				failed = True
+				print("Line ", number, ": exit status ", status, sep="", file=sys.stderr)
+			
+			continue
+		
+		stdout, stderr = sys.stdout, sys.stderr
+		sys.stdout, sys.stderr = StringIO(), StringIO()
+		
+		try:
+			status = invoke(parser, argv) or 0
+			captured = sys.stdout.getvalue(), sys.stderr.getvalue()
+		
+		finally:
+			sys.stdout, sys.stderr = stdout, stderr
+		
+		failed = failed or bool(status)
+		
+		print(dumps(dict(
+				line = number,
+				argv = argv,
+				status = status if isinstance(status, int) else str(status),
+				stdout = captured[0],
+				stderr = captured[1],
+			), sort_keys=True), file=output or sys.stdout)
+	
+	return 1 if failed else 0
@@ -0,0 +1,163 @@
+# encoding: utf-8
+
+"""Persistence of described command trees, keyed by the fingerprints of the sources of the commands described.
+
+Descriptions are stored as JSON beneath `$XDG_CACHE_HOME/marrow.script` (`~/.cache/marrow.script` by default).  Every
+module defining a described command, the root or any sub-command, is fingerprinted; a change to any of them
+invalidates the description.
+
+Describing a large tree means compiling every command within it, as when generating completion scripts.  Invocation
+only compiles the commands along the path taken, faster than the description could be loaded, so does not persist.
+"""
+
+from __future__ import unicode_literals
+
+import os
+import sys
+import json
+
+from hashlib import sha1
+
+from .lazy import Lazy
+from .util import partitionhelp
+
+
+__all__ = ['directory', 'fingerprint', 'location', 'describe', 'load', 'store', 'write']
+
+
+version = 3  # Incremented whenever the structure of persisted descriptions changes.
+
+
+def directory():
+	"""Return the directory persisted descriptions are stored within."""
+	
+	base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+	return os.path.join(base, 'marrow.script')
+
+
+def source(name):
+	"""Return the path, modification time, and size of the source of the named module, or None."""
+	
+	path = getattr(sys.modules.get(name), '__file__', None)
+	
+	return stat(os.path.abspath(path)) if path else None
+
+
+def stat(path):
+	"""Return the path, modification time, and size of the given file, or None if missing."""
+	
+	try:
+		info = os.stat(path)
+	except (IOError, OSError):
+		return None
+	
+	return [path, getattr(info, 'st_mtime_ns', info.st_mtime), info.st_size]
+
+
+def fingerprint(target):
+	"""Return the path, modification time, and size of the source of the module defining the target, or None."""
+	
+	return source(getattr(target, '__module__', None))
+
+
+def location(target):
+	"""Return the path of the file the description of the given command would be persisted to."""
+	
+	name = getattr(target, '__qualname__', None) or target.__name__
+	key = "{0}:{1}:{2}".format(version, target.__module__, name)
+	
+	return os.path.join(directory(), sha1(key.encode('utf-8')).hexdigest() + '.json')
+
+
+def describe(parser, of=None, path='', method=None, tree=None, ancestors=()):
+	"""Describe the command tree of the given parser as a mapping of space-separated command paths to descriptions.
+	
+	The descriptions of class commands additionally map the names of their sub-commands to summaries.  Lazily declared
+	sub-commands are summarized but not imported, and so not described.
+	"""
+	
+	of = parser.command if of is None else of
+	tree = dict() if tree is None else tree
+	
+	node = tree[path] = parser.compile(of, method=method).freeze()
+	node['module'] = getattr(of, '__module__', None)
+	
+	if not isinstance(of, type):
+		return tree
+	
+	node['commands'] = commands = dict()
+	ancestors = ancestors + (of, )
+	
+	for name, member, method in parser.subcommands(of):
+		if isinstance(member, Lazy):
+			commands[name] = partitionhelp(member.__doc__ or None)[0]
+			continue
+		
+		commands[name] = (parser.compile(member, method=method).doc or ([], []))[0]
+		
+		if member not in ancestors:  # Guard against self-referential trees.
+			describe(parser, member, (path + ' ' + name).lstrip(), method, tree, ancestors)
+	
+	return tree
+
+
+def load(target):
+	"""Return the persisted description of the given command, or None if missing or stale."""
+	
+	current = fingerprint(target)
+	
+	if current is None:
+		return None
+	
+	try:
+		with open(location(target), 'r') as fh:
+			data = json.load(fh)
+	except (IOError, OSError, ValueError):
+		return None
+	
+	fingerprints = data.get('fingerprints') or ()
+	
+	# The sources of sub-commands are checked by path, as their modules may not yet have been imported.
+	if current not in fingerprints or any(stat(i[0]) != i for i in fingerprints):
+		return None
+	
+	return data['tree']
+
+
+def store(target, tree):
+	"""Persist the description of the given command, returning the path written or None if unable.
+	
+	Descriptions including commands from modules which can not be fingerprinted are not persisted.
+	"""
+	
+	modules = set(node.get('module') for node in tree.values())
+	modules.add(getattr(target, '__module__', None))
+	fingerprints = [source(name) for name in sorted(modules, key=str)]
+	
+	if None in fingerprints:
+		return None
+	
+	return write(location(target), dict(fingerprints=fingerprints, tree=tree))
+
+
+def write(path, data):
+	"""Atomically write the given data as JSON to the path, creating directories as needed.
+	
+	Returns the path written, or None if unable.  Concurrent readers never see partial writes.
+	"""
+	
+	temporary = path + '.' + str(os.getpid())
+	
+	try:
+		if not os.path.isdir(os.path.dirname(path)):
+			os.makedirs(os.path.dirname(path))
+		
+		with open(temporary, 'w') as fh:
+			json.dump(data, fh)
+		
+		getattr(os, 'replace', os.rename)(temporary, path)
+	
+	except (IOError, OSError):
+		return None
+	
+	return path
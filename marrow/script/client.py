@@ -0,0 +1,77 @@
+# encoding: utf-8
+
+"""A thin client for the warm command server in `marrow.script.server`.
+
+This module deliberately imports nothing beyond the standard library::
+
+	python -m marrow.script.client /path/to/socket [ARGUMENTS...]
+
+Run this way, the package (`marrow.script` and its core) is imported first.  For the fastest startup, run the file
+itself by path instead, which imports nothing else::
+
+	python /path/to/marrow/script/client.py /path/to/socket [ARGUMENTS...]
+
+The exit status of the remote invocation becomes the exit status of the client.
+
+Requires Python 3.3 or later.
+"""
+
+from __future__ import unicode_literals, print_function
+
+import os
+import sys
+import struct
+import socket
+
+from array import array
+from json import dumps
+
+
+__all__ = ['call', 'main']
+
+
+header = struct.Struct('!I')
+status = struct.Struct('!i')
+
+
+def call(path, argv, fds=(0, 1, 2), env=None, cwd=None):
+	"""Invoke the command served at the given socket path, returning its exit status."""
+	
+	payload = dumps(dict(
+			argv = list(argv),
+			env = dict(os.environ if env is None else env),
+			cwd = os.getcwd() if cwd is None else cwd,
+		)).encode('utf-8')
+	
+	client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+	
+	try:
+		client.connect(path)
+		client.sendmsg([header.pack(len(payload))], [(socket.SOL_SOCKET, socket.SCM_RIGHTS, array('i', fds))])
+		client.sendall(payload)
+		
+		data = b''
+		
+		while len(data) < status.size:
+			chunk = client.recv(status.size - len(data))
+			if not chunk: return os.EX_UNAVAILABLE  # The server went away mid-invocation.
+			data += chunk
+		
+		return status.unpack(data)[0]
+	
+	finally:
+		client.close()
+
+
+def main(argv=None):
+	argv = sys.argv[1:] if argv is None else argv
+	
+	if not argv:
+		print("Usage: python -m marrow.script.client SOCKET [ARGUMENTS...]", file=sys.stderr)
+		return os.EX_USAGE
+	
+	return call(argv[0], argv[1:])
+
+
+if __name__ == '__main__':  # pragma: no cover
+	sys.exit(main())
@@ -0,0 +1,9 @@
+# encoding: utf-8
+
+try:
+	from inspect import signature, Parameter
+except ImportError:  # pragma: no cover
+	from funcsigs import signature, Parameter
+
+
+__all__ = ['signature', 'Parameter']
@@ -0,0 +1,224 @@
+# encoding: utf-8
+
+"""Generation of shell completion scripts from the described command tree.
+
+The generated scripts are static: the complete command tree, including sub-command names, long and short options,
+and which arguments accept filesystem paths, is embedded within them, so completion never starts Python nor imports
+the application.  Generate once, e.g. when installing, and regenerate when the interface changes::
+
+	python -m marrow.script.complete bash mypackage.cli:Tool mytool > /etc/bash_completion.d/mytool
+
+Sub-commands declared lazily are offered by name, but their own options are not described.
+"""
+
+from __future__ import unicode_literals, print_function
+
+import os
+import re
+import sys
+
+
+__all__ = ['options', 'bash', 'zsh', 'fish', 'generate', 'main']
+
+
+def quote(value):
+	"""Quote the given value for use as a single word in a POSIX shell."""
+	
+	return "'" + value.replace("'", "'\\''") + "'"
+
+
+def escape(value):
+	"""Quote the given value for use as a single word in the fish shell."""
+	
+	return "'" + value.replace("\\", "\\\\").replace("'", "\\'") + "'"
+
+
+def identifier(prog):
+	"""Return a shell function name derived from the name of the program being completed."""
+	
+	return '__marrow_script_' + re.sub(r'\W', '_', prog)
+
+
+def options(node):
+	"""Yield the long form, abbreviation (or None), whether a value is expected, and whether it is a path, of options."""
+	
+	abbreviation = dict((name, char) for char, name in node['short'].items())
+	pretty = dict((name, alias) for alias, name in node['trans'].items())
+	flags, paths = set(node['flags']), set(node.get('paths', ()))
+	
+	for name in node['named']:
+		yield pretty.get(name, name), abbreviation.get(name), name not in flags, name in paths
+
+
+def files(node):
+	"""Determine if positional arguments of the given node accept filesystem paths."""
+	
+	paths = set(node.get('paths', ()))
+	return any(i in paths for i in list(node['positional']) + [node['indexed']])
+
+
+def transitions(tree):
+	"""Return the (pattern, path) pairs entering sub-commands, and the patterns of options expecting a value.
+	
+	Patterns are of the form "path:word", matched against each preceding word while walking the command line.
+	"""
+	
+	commands, valued, paths = [], [], []
+	
+	for path, node in sorted(tree.items()):
+		for name in sorted(node.get('commands', ())):
+			commands.append((path + ':' + name, (path + ' ' + name).lstrip()))
+		
+		for long, short, value, path_ in options(node):
+			if not value: continue
+			
+			patterns = [path + ':--' + long] + ([path + ':-' + short] if short else [])
+			valued.extend(patterns)
+			if path_: paths.extend(patterns)
+	
+	return commands, valued, paths
+
+
+def bash(tree, prog):
+	"""Return a bash completion script for the given described command tree."""
+	
+	function = identifier(prog)
+	commands, valued, paths = transitions(tree)
+	
+	lines = [
+			function + '() {',
+			'\tlocal cur="${COMP_WORDS[COMP_CWORD]}" path="" option="" word i',
+			'\tfor ((i = 1; i < COMP_CWORD; i++)); do',
+			'\t\tword="${COMP_WORDS[i]}"',
+			'\t\tif [[ -n "$option" ]]; then option=""; continue; fi',
+			'\t\tcase "$path:$word" in',
+		]
+	
+	if valued:
+		lines.append('\t\t\t' + '|'.join(quote(i) for i in valued) + ') option="$path:$word" ;;')
+	
+	for pattern, path in commands:
+		lines.append('\t\t\t' + quote(pattern) + ') path=' + quote(path) + ' ;;')
+	
+	lines.extend(['\t\tesac', '\tdone', '\tif [[ -n "$option" ]]; then'])
+	
+	if paths:
+		lines.append('\t\tcase "$option" in ' + '|'.join(quote(i) for i in paths) +
+				') COMPREPLY=($(compgen -f -- "$cur")) ;; esac')
+	
+	lines.extend(['\t\treturn', '\tfi', '\tcase "$path" in'])
+	
+	for path, node in sorted(tree.items()):
+		switches = []
+		
+		for long, short, value, path_ in options(node):
+			switches.append('--' + long)
+			if short: switches.append('-' + short)
+		
+		lines.extend([
+				'\t\t' + quote(path) + ')',
+				'\t\t\tif [[ "$cur" == -* ]]; then',
+				'\t\t\t\tCOMPREPLY=($(compgen -W ' + quote(' '.join(switches)) + ' -- "$cur"))',
+				'\t\t\telse',
+				'\t\t\t\tCOMPREPLY=($(compgen -W ' + quote(' '.join(sorted(node.get('commands', ())))) + ' -- "$cur"))',
+			])
+		
+		if files(node):
+			lines.append('\t\t\t\tCOMPREPLY+=($(compgen -f -- "$cur"))')
+		
+		lines.extend(['\t\t\tfi', '\t\t\t;;'])
+	
+	lines.extend(['\tesac', '}', 'complete -o filenames -F ' + function + ' ' + quote(prog), ''])
+	
+	return '\n'.join(lines)
+
+
+def zsh(tree, prog):
+	"""Return a zsh completion script for the given described command tree, by way of zsh's bash compatibility."""
+	
+	return 'autoload -U +X bashcompinit && bashcompinit\n' + bash(tree, prog)
+
+
+def fish(tree, prog):
+	"""Return a fish completion script for the given described command tree."""
+	
+	function = identifier(prog)
+	commands, valued, paths = transitions(tree)
+	
+	lines = [
+			'function ' + function,
+			"\tset -l path ''",
+			'\tset -l option 0',
+			'\tfor word in (commandline -opc)[2..-1]',
+			'\t\tif test $option = 1',
+			'\t\t\tset option 0',
+			'\t\t\tcontinue',
+			'\t\tend',
+			'\t\tswitch "$path:$word"',
+		]
+	
+	if valued:
+		lines.extend(['\t\t\tcase ' + ' '.join(escape(i) for i in valued), '\t\t\t\tset option 1'])
+	
+	for pattern, path in commands:
+		lines.extend(['\t\t\tcase ' + escape(pattern), '\t\t\t\tset path ' + escape(path)])
+	
+	lines.extend(['\t\tend', '\tend', '\techo $path', 'end', 'complete -c ' + escape(prog) + ' -f'])
+	
+	for path, node in sorted(tree.items()):
+		prefix = 'complete -c ' + escape(prog) + ' -n ' + escape('test (' + function + ') = ' + escape(path))
+		
+		for name, summary in sorted(node.get('commands', dict()).items()):
+			lines.append(prefix + ' -a ' + escape(name) + (' -d ' + escape(' '.join(summary)) if summary else ''))
+		
+		for long, short, value, path_ in options(node):
+			lines.append(prefix + ' -l ' + escape(long) + (' -s ' + short if short else '') +
+					(' -r' if value else '') + (' -F' if path_ else ''))
+		
+		if files(node):
+			lines.append(prefix + ' -F')
+	
+	lines.append('')
+	
+	return '\n'.join(lines)
+
+
+def generate(parser, shell='bash', prog=None):
+	"""Return the completion script for the given shell describing the command tree of the given parser."""
+	
+	try:
+		renderer = dict(bash=bash, zsh=zsh, fish=fish)[shell]
+	except KeyError:
+		raise ValueError("Unsupported shell: " + shell)
+	
+	if parser.persist:
+		tree = parser.persisted()
+	else:
+		from .cache import describe
+		tree = describe(parser)
+	
+	return renderer(tree, prog or os.path.basename(sys.argv[0]))
+
+
+def main(argv=None):
+	"""Emit the completion script for a command referenced by import path: SHELL MODULE:ATTRIBUTE [PROG]"""
+	
+	from .core import Parser
+	from .lazy import load
+	
+	argv = sys.argv[1:] if argv is None else argv
+	
+	if len(argv) not in (2, 3):
+		print("Usage: python -m marrow.script.complete bash|zsh|fish <module:attribute> [program]", file=sys.stderr)
+		return os.EX_USAGE
+	
+	shell, reference = argv[:2]
+	prog = argv[2] if len(argv) == 3 else reference.partition(':')[0].rpartition('.')[2]
+	
+	sys.stdout.write(generate(Parser(load(reference)), shell, prog))
+	
+	return 0
+
+
+if __name__ == '__main__':
+	sys.exit(main())
@@ -6,46 +6,335 @@ from __future__ import unicode_literals
 import os
 import sys
 
-from inspect import getargspec, getdoc, isfunction, ismethod, isclass
+from types import FunctionType, MethodType
+from weakref import WeakKeyDictionary, WeakSet, ref
 
-from marrow.util.bunch import Bunch
-from marrow.util.convert import boolean, array
-from marrow.script.util import wrap, partitionhelp
+from marrow.script.util import ArgSpec, argspec, boolean, pathlike, numeric, vector, invalid, failure, wrap, \
+        partitionhelp, delimited, response
 
 from .exc import ExitException, ScriptError, MalformedArguments
+from .lazy import Lazy
+from .typecast import resolve, memoize
 
 
-__all__ = ['ExitException', 'ScriptError', 'MalformedArguments', 'Parser']
+__all__ = ['ExitException', 'ScriptError', 'MalformedArguments', 'Specification', 'Cursor', 'Parser']
 
 
 # Mac OS X terminal lies, so do others, probably.
 # TODO: Needs testing; works on OS X.
 encoding = sys.getdefaultencoding() if sys.getdefaultencoding() != 'ascii' else 'utf8'
 
-log = __import__('logging').getLogger(__name__)
+string = (bytes, type(''))
 
 
 
 
+class Specification(object):
+    """The compiled description of the command-line interface of a single callable.
+
+    Built once per target by `Parser.compile` and cached; treat instances as immutable.  The target is referenced
+    weakly where possible, as specifications are cached against it and must not keep it alive.
+    """
+
+    __slots__ = ('reference', '_doc', 'cls', 'fn', 'method', 'spec', 'trans', 'positional', 'named',
+            'defaults', 'indexed', 'keyed', 'docs', 'range', 'cast', 'short', 'callbacks', 'streamed', 'delimiter',
+            'parallel', 'formatted', '__weakref__')
+
+    def __init__(self, target, method=False, defaults=True, data=None):
+        """Inspect the target callable.
+
+        Optionally, pre-populate the callbacks for --help/-h and --version/-V.  If `data` previously produced by
+        `freeze` is given the abbreviations and docstring are restored from it rather than determined anew.
+        """
+
+        try:
+            self.reference = ref(target)
+        except TypeError:  # Not weakly referenceable, thus not cached.
+            self.reference = lambda: target
+
+        self.cls = isinstance(target, type)
+        self.fn = isinstance(target, FunctionType)
+        self.method = method
+
+        try:
+            self.spec = argspec(self.callable)
+        except TypeError as e:
+            if hasattr(self.callable, '__code__'):  # e.g. required keyword-only arguments.
+                raise ScriptError(e.args[0])
+
+            # __init__ of built-in class, such as object
+            self.spec = ArgSpec(args=['self'], varargs=None, keywords=None, defaults=None)
+
+        args = self.spec.args
+        count = len(args) - len(self.spec.defaults or [])
+
+        self.trans = dict((i.replace('_', '-'), i) for i in args)
+        self.positional = tuple(args[:count])
+        named = list(args[count:])
+        self.defaults = dict((i, j) for i, j in zip(reversed(args), reversed(self.spec.defaults or [])))
+        self.indexed = self.spec.varargs
+        self.keyed = self.spec.keywords
+        self.docs = dict()
+
+        if self.cls or self.method:
+            self.positional = self.positional[1:]
+
+        # A streamed argument takes the place of variable positional arguments, but is passed a lazy iterator, or an
+        # array if annotated with a numeric typecast.
+        streams = getattr(self.callable, '_cmd_arg_stream', None) or dict()
+        self.streamed = self.delimiter = None
+
+        if streams:
+            (self.streamed, self.delimiter), = streams.items()
+
+            if self.cls or self.spec.varargs or self.positional[-1:] != (self.streamed, ):
+                raise ScriptError("Only the last positional argument of a function lacking *args may be streamed.")
+
+            self.indexed = self.streamed
+            self.positional = self.positional[:-1]
+
+        self.range = (len(self.positional), sys.maxsize if self.spec.varargs else len(self.positional))
+
+        cast = dict()
+        short = dict()
+        callbacks = dict()
+
+        if defaults:
+            # Callbacks are named methods of the Parser, resolved at the time of invocation.
+            named.extend(('help', 'version'))
+            callbacks.update(help='help', version='version')
+            short.update(h='help', V='version')
+            cast.update(help=boolean, version=boolean)
+
+        # Variable positional arguments may be independent work items, fanned out across a pool; see parallel.
+        self.parallel = getattr(self.callable, '_cmd_parallel', None)
+
+        if self.parallel is not None:
+            if self.cls or not self.spec.varargs or 'jobs' in args:
+                raise ScriptError("Only functions accepting *args, lacking a jobs argument, may be run in parallel.")
+
+            named.append('jobs')
+            self.trans['jobs'] = 'jobs'
+            cast['jobs'] = int
+            if 'j' not in short: short['j'] = 'jobs'
+            self.docs['jobs'] = "Process this many work items concurrently.\nDefault: the number of available processors."
+
+        # Returned records may be serialized in a structured format; see marrow.script.output.
+        self.formatted = getattr(self.callable, '_cmd_format', None)
+
+        if self.formatted is not None:
+            if self.cls or 'format' in args:
+                raise ScriptError("Only functions and methods lacking a format argument may have formatted output.")
+
+            named.append('format')
+            self.trans['format'] = 'format'
+            self.docs['format'] = "Serialize results as json, jsonl, csv, or tsv.\nDefault: %r" % (self.formatted.get('default'), )
+
+        if data:
+            short = dict(data['short'])
+            self._doc = data['doc']
+
+        # Determine typecasting information from annotations, or inferred from default values; see typecast.
+        hints = getattr(self.callable, '__annotations__', None) or dict()
+
+        for name in args + ([self.spec.varargs] if self.spec.varargs else []):
+            hint = hints.get(name)
+
+            if isinstance(hint, (type(''), bytes, tuple)):  # Descriptive annotations, as used by schemas.
+                hint = None
+
+            try:
+                converter = resolve(hint, self.defaults.get(name))
+            except TypeError:  # Unsupported annotations are left for other uses.
+                converter = resolve(None, self.defaults.get(name))
+
+            if converter is not None:
+                cast[name] = converter
+
+        for name in () if data else sorted(self.defaults):
+            # Determine abbreviations.
+            for char in "".join(i for j in zip(name, name.upper()) for i in j):
+                if char in short: continue
+                short[char] = name
+                break
+
+        annotated = getattr(self.callable, '_cmd_arg_type', dict())
+        cast.update((name, resolve(hint) or hint) for name, hint in annotated.items())
+
+        # Converters marked pure are memoized, with a cache belonging to this specification.
+        for name, converter in cast.items():
+            cast[name] = memoize(converter)
+
+        callbacks.update(getattr(self.callable, '_cmd_arg_callback', ()))
+
+        self.named = tuple(named)
+        self.cast = cast
+        self.short = short
+        self.callbacks = callbacks
+
+    @property
+    def target(self):
+        """The callable this specification describes."""
+
+        return self.reference()
+
+    @property
+    def callable(self):
+        """The callable whose arguments are described: the target, or the initializer of a target class."""
+
+        target = self.reference()
+        return target.__init__ if self.cls else target
+
+    @property
+    def doc(self):
+        """The summary and description partitioned from the docstring of the target, determined on first use."""
+
+        try:
+            return self._doc
+        except AttributeError:
+            pass
+
+        from inspect import getdoc
+
+        doc = getdoc(self.target)
+        self._doc = partitionhelp(doc) if doc else None
+
+        return self._doc
+
+    def freeze(self):
+        """Return a plain, serializable description of this specification, e.g. for persistence."""
+
+        return dict(
+                doc = self.doc,
+                short = self.short,
+                trans = self.trans,
+                positional = self.positional,
+                named = self.named,
+                indexed = self.indexed,
+                keyed = self.keyed,
+                flags = sorted(i for i in self.named if self.cast.get(i) is boolean),
+                paths = sorted(i for i, cast in self.cast.items() if pathlike(cast)),
+            )
+
+
+class Cursor(object):
+    """A single-pass cursor over the raw argument list of a single invocation.
+
+    Every nesting level of `Parser.execute` resumes consumption where the previous level stopped.  If enabled,
+    arguments of the form `@path` are replaced by the arguments contained in that response file, as they are reached.
+    Response files may refer to others, but not, directly or indirectly, to themselves.
+    """
+
+    __slots__ = ('sources', 'paths', 'pending', 'literal', 'responses')
+
+    def __init__(self, argv, responses=False):
+        self.sources = [iter(argv)]  # A stack of raw argument iterators; response files are pushed on top.
+        self.paths = [None]  # The resolved paths of the response files on the stack of sources, to detect cycles.
+        self.pending = []  # Expanded tokens awaiting consumption, in reverse order.
+        self.literal = False  # Set once a double-hyphen has been reached.
+        self.responses = responses
+
+    def __iter__(self):
+        """Iterate the remaining (non-empty) arguments without further expansion."""
+
+        pending = self.pending
+
+        while pending:
+            yield pending.pop()
+
+        while True:
+            arg = self.read()
+            if arg is None: return
+            if arg: yield arg
+
+    def read(self):
+        """Return the next raw argument, or None if the argument list has been exhausted."""
+
+        sources = self.sources
+        paths = self.paths
+
+        while sources:
+            arg = next(sources[-1], None)
+
+            if arg is None:
+                sources.pop()
+                paths.pop()
+                continue
+
+            if self.responses and arg[:1] == '@' and len(arg) > 1 and not self.literal:
+                path = os.path.realpath(arg[1:])
+
+                if path in paths:
+                    raise MalformedArguments("Recursive response file: " + arg[1:])
+
+                try:
+                    sources.append(response(arg[1:]))
+                except (IOError, OSError):
+                    return arg  # Like GCC, an unreadable response file is passed along as a literal argument.
+
+                paths.append(path)
+                continue
+
+            return arg
+
+        return None
+
+    def push(self, token):
+        """Return an already expanded token to the cursor to be consumed again."""
+
+        self.pending.append(token)
+
+
 class Parser(object):
-    def __init__(self, command):
+    cache = WeakKeyDictionary()  # Compiled specifications, keyed by target then (method, defaults).
+    rendered = dict()  # Rendered help pages, keyed by the ids of the command path specifications, program, and width.
+    columns = None  # The cached width of the terminal, discarded on resize.
+    watching = False  # Has the resize signal handler been installed?
+    sized = WeakSet()  # The classes whose cached terminal width is to be discarded on resize.
+
+    def __init__(self, command, responses=False, persist=False, loop=None):
         self.command = command
+        self.responses = responses  # Expand @path arguments from response files.
+        self.persist = persist  # Persist the described command tree on disk, for completion; see marrow.script.cache.
+        self.loop = loop  # Event loop factory for asynchronous commands; see marrow.script.aio.
+        self.runner = None
+        self.hooks = dict()  # Instrumentation event handlers; see hook and marrow.script.hooks.
+        self.tree = None
         self.stack = []
 
     def __call__(self, argv=None, *args):
         # Gather together the argument list.
-        arguments = ([argv] + list(args)) if args else ((argv if isinstance(argv, list) else [argv]) if argv else [])
+        arguments = ([argv] + list(args)) if args else (([argv] if isinstance(argv, string) else argv) if argv else [])
+
+        if 'MARROW_SCRIPT_TIMINGS' in os.environ or 'MARROW_SCRIPT_PROFILE' in os.environ:
+            from .timing import measure
+            return measure(self, arguments)
+
+        return self.dispatch(arguments)
+
+    def dispatch(self, arguments):
+        """Execute the command with the given argument list, returning the exit status.
+
+        Iterables returned by the command are written to standard output.  Malformed arguments and uncaught exceptions
+        are reported along with help.
+        """
 
         def help():
             try:
-                self.stack[-1].callbacks['help'](True, self.stack[-1])
+                self.help(True, self.stack[-1])
             except ExitException:
                 pass
 
             return os.EX_USAGE
 
         try:
-            return self.execute(arguments) or 0
+            result = self.execute(arguments)
+
+            if result is not None and not isinstance(result, int) and hasattr(result, '__iter__'):
+                from .output import iterable, stream
+                if iterable(result): return stream(result)
+
+            return result or 0
 
         except ExitException as e:
             return e.args[0]
@@ -57,142 +346,271 @@ class Parser(object):
 
         except Exception as e:
             if not self.stack: raise
-            log.exception("Uncaught exception.")
+            __import__('logging').getLogger(__name__).exception("Uncaught exception.")
             return help()
 
     def execute(self, arguments):
-        parent = None
         current = self.command
+        arguments = Cursor(arguments, self.responses)
         self.stack = []
 
-        while True:
-            spec = self.specification(of=current, via=parent)
-            self.stack.append(spec)
+        try:
+            while True:
+                spec = self.compile(current)
+                self.stack.append(spec)
 
-            arguments = self.expand(arguments, via=spec)
-            args, kwargs, arguments = self.arguments(arguments, via=spec)
+                args, kwargs = self.arguments(arguments, via=spec)
+                # Exceeding the upper bound means the rest of the cursor was consumed, e.g. by a streamed argument.
+                remainder = None if len(args) > spec.range[1] else self.token(arguments, via=spec)
 
-            if (arguments and not spec.cls) or \
-                    (spec.cls and arguments and arguments[0][0] == '-'):
-                raise MalformedArguments("Unknown argument: " + arguments[0])
+                if (remainder is not None and not spec.cls) or \
+                        (spec.cls and remainder is not None and remainder[0] == '-'):
+                    raise MalformedArguments("Unknown argument: " + remainder)
 
-            if len(args) < spec.range[0]:
-                raise MalformedArguments("Insufficient positional arguments.")
+                if len(args) < spec.range[0]:
+                    raise MalformedArguments("Insufficient positional arguments.")
 
-            if not spec.cls:
-                return spec.callable(*args, **kwargs)
+                if spec.parallel is not None:
+                    from .parallel import fanout
+                    return fanout(current, args, kwargs, spec)
 
-            parent = spec.instance = spec.target(*args, **kwargs)
+                if spec.formatted is not None:
+                    from .output import formats, serialize
 
-            if not arguments:
-                raise MalformedArguments("Command not specified.")
+                    form = kwargs.pop('format', None) or spec.formatted.get('default')
 
-            current = getattr(spec.instance, arguments.pop(0))
+                    if form is not None and form not in formats:
+                        raise MalformedArguments("Unknown output format: " + form)
 
-    def specification(self, of, defaults=True, via=None):
-        """Build our internal specification of the target callable.
+                    result = self.call(spec, current, args, kwargs)
 
-        Optionally, pre-populate the callbacks for --help/-h and --version/-V.
+                    if form is None or result is None or isinstance(result, int):
+                        return result
+
+                    return serialize(result, form)
+
+                if not spec.cls:
+                    return self.call(spec, current, args, kwargs)
+
+                instance = self.call(spec, current, args, kwargs)
+
+                if remainder is None:
+                    raise MalformedArguments("Command not specified.")
+
+                current = getattr(instance, remainder)
+
+        finally:
+            if self.runner is not None:
+                self.runner.close()
+                self.runner = None
+
+    def call(self, spec, target, args, kwargs):
+        """Call the command, or instantiate the class command, at one level of the command path.
+
+        Awaitable results are run to completion, including instances resolving to themselves once asynchronously
+        initialized.
+        """
+
+        return self.awaited(target(*args, **kwargs))
+
+    def awaited(self, value):
+        """Return the given value, or its result if awaitable, run to completion on the managed event loop."""
+
+        if not hasattr(value, '__await__'):
+            return value
+
+        if self.runner is None:
+            from .aio import Runner
+            self.runner = Runner(self.loop)
+
+        return self.runner.run(value)
+
+    def compile(self, of, defaults=True, method=None, data=None):
+        """Return the compiled specification of the target callable, building it on first use.
+
+        Specifications are cached by the identity of the target (or the function underlying a bound method) and
+        shared between Parser instances, as they contain no per-invocation state.  Pass `method` to compile a plain
+        function as the method it will be bound as, and `data` to build from a persisted description.
         """
 
-        cmd = Bunch(target=of)
-        cmd.doc = partitionhelp(getdoc(cmd.target)) if getdoc(cmd.target) else None
-        cmd.cls = isclass(cmd.target)
-        cmd.fn = isfunction(cmd.target)
-        cmd.method = ismethod(cmd.target)
-        cmd.callable = cmd.target.__init__ if cmd.cls else cmd.target
-        
+        bound = isinstance(of, MethodType)
+        target = of.__func__ if bound else of
+        method = bound if method is None else method
+        key = (method, defaults)
+
         try:
-            cmd.spec = getargspec(cmd.callable)
+            variants = self.cache[target]
+        except KeyError:
+            variants = self.cache[target] = dict()
         except TypeError:
-            # __init__ of built-in class, such as object
-            cmd.spec = Bunch(args=['self'], varargs=None, keywords=None, defaults=None)
-        
-        cmd.trans = dict((i.replace('_', '-'), i) for i in cmd.spec.args)
-        cmd.positional = cmd.spec.args[:len(cmd.spec.args)-len(cmd.spec.defaults or [])]
-        cmd.named = cmd.spec.args[len(cmd.spec.args)-len(cmd.spec.defaults or []):]
-        cmd.defaults = dict((i, j) for i, j in zip(reversed(cmd.spec.args), reversed(cmd.spec.defaults or [])))
-        cmd.instance = None
-        cmd.indexed = cmd.spec.varargs
-        cmd.keyed = cmd.spec.keywords
-        cmd.docs = dict()
-        cmd.parent = via
-
-        if cmd.cls or cmd.method:
-            cmd.positional = cmd.positional[1:]
-
-        cmd.range = (len(cmd.positional), 65535 if cmd.spec.varargs else len(cmd.positional))
+            # Targets that can not be weakly referenced can not be cached.
+            return self.build(target, method, defaults, data)
 
-        cast = dict()
-        short = dict()
-        callbacks = dict()
+        spec = variants.get(key)
 
-        if defaults:
-            cmd.named.extend(('help', 'version'))
-            callbacks.update(help=self.help, version=self.version)
-            short.update(h='help', V='version')
-            cast.update(help=boolean, version=boolean)
+        if spec is None:
+            spec = variants[key] = self.build(target, method, defaults, data)
 
-        for name in sorted(cmd.defaults):
-            # Determine typecasting information.
-            if isinstance(cmd.defaults[name], bool): cast[name] = boolean
-            elif isinstance(cmd.defaults[name], (list, tuple)): cast[name] = array
-            elif cmd.defaults[name] is not None: cast[name] = type(cmd.defaults[name])
+        return spec
 
-            # Determine abbreviations.
-            for char in "".join(i for j in zip(name, name.upper()) for i in j):
-                if char in short: continue
-                short[char] = name
-                break
+    def build(self, target, method, defaults, data):
+        """Build a new specification; see `compile`."""
+
+        if 'built' in self.hooks:
+            from .hooks import built
+            return built(self, Specification, target, method, defaults, data)
+
+        return Specification(target, method, defaults, data)
+
+    def hook(self, event, handler):
+        """Register a handler to be called upon the named instrumentation event of this parser.
+
+        See `marrow.script.hooks` for the events and the arguments handlers receive.  Parsers without handlers for
+        an event pay nothing to observe it.
+        """
+
+        from .hooks import events, instrument
+
+        if event not in events:
+            raise ValueError("Unknown event: " + event)
+
+        self.hooks.setdefault(event, []).append(handler)
+        instrument(self, event)
+
+    def unhook(self, event, handler):
+        """Unregister a handler previously registered using `hook`."""
+
+        self.hooks[event].remove(handler)
+        if not self.hooks[event]: del self.hooks[event]
+
+    def preload(self, of=None, method=False, seen=None):
+        """Compile the specifications of the entire command tree ahead of time, e.g. prior to forking.
+
+        Sub-commands are the public callable attributes of class commands, compiled recursively.
+        """
+
+        of = self.command if of is None else of
+        seen = set() if seen is None else seen
 
-        cmd.cast = cast
-        cmd.short = short
-        cmd.callbacks = callbacks
+        if id(of) in seen: return
+        seen.add(id(of))
 
-        return cmd
+        spec = self.compile(of, method=method or None)
+
+        if not spec.cls: return
+
+        for name, member, method in self.subcommands(of):
+            if isinstance(member, Lazy):
+                # Preloading is precisely when lazily declared sub-commands should be imported.
+                member = member.resolve()
+
+            self.preload(member, method, seen)
+
+    @staticmethod
+    def subcommands(of):
+        """Yield the name, value, and method flag of each sub-command of a class command.
+
+        Sub-commands declared lazily are not resolved.  Plain functions will be bound when retrieved from the
+        command instance, unless they are static, and so are flagged as methods.
+        """
+
+        for name in dir(of):
+            if name[0] == '_': continue
+
+            member = getattr(of, name)
+            if not callable(member): continue
+
+            raw = next((vars(i)[name] for i in of.__mro__ if name in vars(i)), None)
+            yield name, member, isinstance(member, FunctionType) and not isinstance(raw, staticmethod)
+
+    def persisted(self):
+        """Return the persisted description of the command tree, used for completion, storing it if missing or stale."""
+
+        if self.tree is None:
+            from .cache import load, store, describe
+
+            self.tree = load(self.command)
+
+            if self.tree is None:
+                self.tree = describe(self)
+                store(self.command, self.tree)
+
+        return self.tree
+
+    def specification(self, of, defaults=True, via=None):
+        """Build our internal specification of the target callable.
+
+        Optionally, pre-populate the callbacks for --help/-h and --version/-V.
+
+        This is a compatibility alias for `compile`; the `via` argument is no longer used.
+        """
+
+        return self.compile(of, defaults)
 
     def help(self, value, via):
-        """Display a GNU-ish help page listing arguments and possible sub-commands."""
+        """Display a GNU-ish help page listing arguments and possible sub-commands.
+
+        The page is rendered once per command path, program name, and terminal width, then emitted in a single write.
+        """
+
         width = self.width()
+        key = (tuple(id(spec) for spec in self.stack), os.path.basename(sys.argv[0]), width)
+        refs, page = self.rendered.get(key, ((), None))
+
+        # Specifications are referenced weakly, not to outlive the spec cache; an id may be reused once one is collected.
+        if page is None or [i() for i in refs] != self.stack:
+            if len(self.rendered) >= 256: self.rendered.clear()  # Bound the cache, e.g. for uncacheable targets.
+            page = self.render(width)
+            self.rendered[key] = (tuple(ref(spec) for spec in self.stack), page)
+
+        sys.stdout.write(page)
+        sys.stdout.flush()
+
+        raise ExitException(os.EX_USAGE, None)
+
+    def render(self, width):
+        """Return the text of the help page for the current command stack, wrapped to the given width."""
+
+        out = []
 
         # Output the summary information.
         for i, spec in enumerate(self.stack):
             summary, description = spec.doc or (None, None)
 
             if not i:
-                if summary: print(wrap(summary, width))
-                print("Usage:", os.path.basename(sys.argv[0]), end=" ")
+                if summary: out.extend((wrap(summary, width), "\n"))
+                out.extend(("Usage: ", os.path.basename(sys.argv[0]), " "))
 
             else:
-                print(spec.callable.__name__, end=" ")
+                out.extend((spec.callable.__name__, " "))
 
             if spec.named:
-                print("[CMDOPTS]" if i else "[OPTIONS]", end=" ")
+                out.append("[CMDOPTS] " if i else "[OPTIONS] ")
 
             if spec.keyed:
-                print("[--name=value...]", end=" ")
+                out.append("[--name=value...] ")
 
             for arg in spec.positional:
-                print("<", arg, ">", sep="", end=" ")
+                out.extend(("<", arg, "> "))
 
             if spec.indexed:
-                print("[value...]", end=" ")
+                out.append("[value...] ")
 
             if spec.cls and len(self.stack) == i + 1:
-                print("<COMMAND> ...", end="")
+                out.append("<COMMAND> ...")
 
-        print()
+        out.append("\n")
 
         # Output the details.
         for i, spec in enumerate(self.stack):
             summary, description = spec.doc or (None, None)
 
             if i:
-                print("\nCommand:", spec.callable.__name__)
-                if summary: print(wrap(summary, width))
+                out.extend(("\nCommand: ", spec.callable.__name__, "\n"))
+                if summary: out.extend((wrap(summary, width), "\n"))
 
             if spec.named:
-                print("\n", "CMDOPTS" if i else "OPTIONS", " may be one or more of:", sep="", end="\n\n")
+                out.extend(("\n", "CMDOPTS" if i else "OPTIONS", " may be one or more of:\n\n"))
 
                 strings = dict()
                 abbreviation = dict(zip(spec.short.values(), spec.short.keys()))
@@ -200,51 +618,65 @@ class Parser(object):
 
                 for name in spec.named:
                     default = spec.defaults.get(name)
+                    label = (("-" + abbreviation[name] + ", ") if name in abbreviation else "") + "--" + pretty.get(name, name)
 
                     if spec.cast.get(name, None) is boolean:
-                        strings[(("-" + abbreviation[name] + ", ") if name in abbreviation else "") + "--" + pretty.get(name, name)] = \
-                                spec.docs.get(name, "Toggle this value.\nDefault: %r" % default)
+                        strings[label] = spec.docs.get(name, "Toggle this value.\nDefault: %r" % default)
                         continue
 
-                    strings["-" + abbreviation[name] + ", --" + pretty.get(name, name) + "=VAL"] = \
-                            spec.docs.get(name, "Override this value.\nDefault: %r" % default)
+                    strings[label + "=VAL"] = spec.docs.get(name, "Override this value.\nDefault: %r" % default)
 
-                mlen = max([len(j) for j in strings])
-                for name in sorted(strings):
-                    print(" %-*s  %s" % (mlen, name, wrap(strings[name], width).replace("\n", "\n" + " " * (mlen + 3))))
+                self.table(out, strings, width)
 
             if spec.cls and len(self.stack) == i + 1:
-                print("\n", "COMMAND may be one of:", sep="", end="\n\n")
+                out.append("\nCOMMAND may be one of:\n\n")
 
                 cmds = dict()
-                for cmd in dir(spec.target):
-                    if cmd[0] == '_' or not callable(getattr(spec.target, cmd)): continue
-                    cmds[cmd] = partitionhelp(getdoc(getattr(spec.target, cmd)) or "Undocumented command.")[0]
+                for name, member, method in self.subcommands(spec.target):
+                    if isinstance(member, Lazy):
+                        cmds[name] = partitionhelp(member.__doc__ or "Undocumented command.")[0]
+                        continue
 
-                mlen = max([len(i) for i in cmds])
-                for name in sorted(cmds):
-                    print(" %-*s  %s" % (mlen, name, wrap(cmds[name], width).replace("\n", "\n" + " " * (mlen + 3))))
+                    cmds[name] = (self.compile(member, method=method).doc or (["Undocumented command."], ))[0]
 
-                print("\n", wrap("For help on a specific command, call the command and pass --help in CMDOPTS.", width), sep="")
+                self.table(out, cmds, width)
 
-            if description: print("\n", wrap(description, width), sep="")
+                out.extend(("\n", wrap("For help on a specific command, call the command and pass --help in CMDOPTS.", width), "\n"))
 
-        print()
+            if description: out.extend(("\n", wrap(description, width), "\n"))
 
-        raise ExitException(os.EX_USAGE, None)
+        out.append("\n")
+
+        return "".join(out)
+
+    @staticmethod
+    def table(out, strings, width):
+        """Append a two-column table of the given labels and their wrapped descriptions to the output."""
+
+        if not strings: return
+
+        mlen = max([len(j) for j in strings])
+        for name in sorted(strings):
+            out.append(" %-*s  %s\n" % (mlen, name, wrap(strings[name], width).replace("\n", "\n" + " " * (mlen + 3))))
 
     def version(self, value, via):
         """Attempt to determine the owning package, version, author, and copyright information."""
         pass
-    
-    @staticmethod
-    def width(fallback=79):
-        """Return the width of the current terminal, or the fallback value."""
+
+    @classmethod
+    def width(cls, fallback=79):
+        """Return the width of the current terminal, or the fallback value.
+
+        The width of a terminal is determined once, then cached until the terminal is resized (SIGWINCH).
+        """
 
         width = fallback
 
         # Determine current terminal width, if possible.
         if sys.stdout.isatty():
+            if cls.columns is not None:
+                return cls.columns
+
             try:
                 # Use terminal control codes if possible.
                 import fcntl, termios, struct
@@ -256,83 +688,143 @@ class Parser(object):
                     width = int(os.environ['COLUMNS']) - 1
                 except:
                     # TODO: Fall back on curses, then ANSI.
-                    pass
+                    return width
+
+            cls.columns = width
+            cls.resizing()
 
         return width
 
-    def expand(self, arguments, via):
-        """Expand short arguments into long ones and expand equations.
+    @classmethod
+    def resizing(cls):
+        """Arrange for the cached terminal width of this class to be discarded when the terminal is resized.
 
-        Silently ignores unknown arguments to allow repeated calling for sub-commands.
+        A single signal handler is installed per process, resetting the width cached by each class which requested it.
+        """
 
-        `arguments`:
-            a list of arguments
-        `via`:
-            the specification we are expanding from
+        Parser.sized.add(cls)
 
-        You can override this in a subclass to perform additional transformations if you wish.
+        if Parser.watching: return
+        Parser.watching = True
+
+        import signal
+
+        if not hasattr(signal, 'SIGWINCH'): return
+
+        previous = signal.getsignal(signal.SIGWINCH)
+
+        def resized(signum, frame):
+            Parser.resized()
+            if callable(previous): previous(signum, frame)
+
+        try:
+            signal.signal(signal.SIGWINCH, resized)
+        except ValueError:  # Only the main thread may install signal handlers; the width is then never cached.
+            Parser.watching = False
+            Parser.sized.discard(cls)
+            cls.columns = None
+
+    @staticmethod
+    def resized():
+        """Discard the terminal width cached by each class, e.g. once standard output refers to another terminal."""
+
+        for kind in list(Parser.sized):
+            kind.columns = None
+
+    def token(self, arguments, via):
+        """Return the next expanded token from the cursor, or None once the argument list has been exhausted.
+
+        Raw arguments are expanded lazily, using the specification of the command currently consuming them.
         """
 
-        result = []
+        if arguments.pending:
+            return arguments.pending.pop()
 
-        for arg in arguments:
-            # Ensure arguments are unicode.
-            # arg = arg.decode(encoding) if isinstance(arg, binary) else arg
+        while True:
+            arg = arguments.read()
+
+            if arg is None:
+                return None
 
             # Skip the impossibility of empty arguments.
             if not arg: continue
 
             # A double-hyphen argument signals the end of hyphenated arguments.
-            if arg == '--' or '--' in result:
-                result.append(arg)
-                continue
+            if arguments.literal:
+                return arg
+
+            if arg == '--':
+                arguments.literal = True
+                return arg
 
-            # Now we start looking for our hyphenated options.
-            if len(arg) >= 2 and arg[0] == '-':
-                if arg[1] == '-':
-                    # This is a long-form argument.
-                    name, _, value = arg.partition('=')
+            expanded = self.expand(arg, via)
 
-                    # We append the name, then value if one exists.
-                    result.append(name)
-                    if value: result.append(value)
+            if not expanded: continue
 
-                    continue
+            if '--' in expanded:  # e.g. "--=value", also ending hyphenated arguments.
+                arguments.literal = True
 
-                # Expand short arguments into long ones.
-                for char in arg[1:]:
-                    name = via.short.get(char, None)
-                    if name: result.append('--' + name)
-                    else: result.append('-' + char)
+            if len(expanded) > 1:
+                arguments.pending.extend(reversed(expanded[1:]))
 
-                continue
+            return expanded[0]
+
+    def expand(self, arg, via):
+        """Expand a short argument into long ones and split equations.
+
+        Called for each raw argument as it is reached (but never for those following a double-hyphen) and returns a
+        sequence of resulting tokens.  Silently ignores unknown arguments to allow repeated calling for sub-commands.
+
+        `arg`:
+            a single argument
+        `via`:
+            the specification we are expanding from
+
+        You can override this in a subclass to perform additional transformations if you wish.
+        """
 
-            # Other values we just pass along.
-            result.append(arg)
+        # Other values we just pass along.
+        if len(arg) < 2 or arg[0] != '-':
+            return (arg, )
 
-        return result
+        if arg[1] == '-':
+            # This is a long-form argument; we return the name, then value if one exists.
+            name, _, value = arg.partition('=')
+            return (name, value) if value else (name, )
+
+        # Expand short arguments into long ones.
+        short = via.short
+        return tuple(('--' + short[char]) if char in short else ('-' + char) for char in arg[1:])
 
     def arguments(self, arguments, via):
-        """Process the given command-line arguments and return the positional, keyword, and remaining arguments.
+        """Consume the positional and keyword arguments accepted by the given specification from the cursor.
 
-        Expects long-form arguments only, thus the output of the self.expand method.
+        Returns a 2-tuple of positional and keyword arguments.  The first token not accepted is left on the cursor for
+        the next nesting level to consume.
         """
-        
-        remainder = []
-        arguments = arguments[::-1]  # We reverse the argument list as popping is more efficient from the end.
+
         parsing = True
         args = []
         kwargs = {}
+        limit = via.range[1]
 
-        while arguments:
-            arg = arguments.pop()
+        while True:
+            arg = self.token(arguments, via)
+
+            if arg is None:
+                break
 
             if arg == '--':
                 # Stop processing keyword arguments.
                 parsing = False
                 continue
-            
-            if not parsing or ( arg[:2] != '--' and len(args) < via.range[1] ):
+
+            if via.streamed and len(args) == limit and (not parsing or arg[:2] != '--'):
+                # The first streamed value; it and all that follow are consumed lazily.
+                arguments.push(arg)
+                break
+
+            if not parsing or (arg[:2] != '--' and len(args) < limit):
                 # Positional argument.
                 args.append(self.transform(
                         name=via.positional[len(args)] if len(args) < len(via.positional) else None,
@@ -341,24 +833,95 @@ class Parser(object):
                     ))
                 continue
 
-            if (arg[0] == '-' and arg[1] != '-') or \
-                    (arg[:2] == '--' and (via.trans.get(arg[2:], arg[2:]) not in via.named and not via.keyed)) or \
-                    (arg[:2] != '--' and len(args) == via.range[1]):
+            name = via.trans.get(arg[2:], arg[2:])
+
+            if arg[:2] != '--' or (name not in via.named and not via.keyed):
                 # Unknown keyword argument or too many positional arguments, exiting early.
-                remainder.append(arg)
-                remainder.extend(reversed(arguments))
-                break
+                arguments.push(arg)
+                return self.packed(args, via), kwargs
 
             # Keyword argument.
-            arg = arg[2:]
+            if via.cast.get(name, None) is boolean:
+                kwargs[name] = self.transform(name=name, value=not via.defaults.get(name, False), via=via)
+                continue
+
+            value = self.token(arguments, via)
+
+            if value is None:
+                raise MalformedArguments("Missing value for argument: " + arg)
+
+            kwargs[name] = self.transform(name=name, value=value, via=via)
+
+        if via.streamed and len(args) == limit:
+            cast = via.cast.get(via.streamed)
+
+            if numeric(cast):  # Numeric values are gathered into a compact array in a single pass.
+                args.append(self.vector(self.stream(arguments, via, False), cast, via.streamed))
+            else:
+                args.append(self.stream(arguments, via))
+
+        return self.packed(args, via), kwargs
+
+    def packed(self, args, via):
+        """Typecast the variable positional arguments, if annotated, in bulk.
+
+        The values are mapped through the converter directly, rather than one call to `transform` each.  They are
+        unpacked again when called, so are not gathered into an array.  Only on failure is each value examined
+        individually, to report every invalid value, by position, at once.
+        """
+
+        split = len(via.positional)
+        cast = via.cast.get(via.indexed)
+
+        if cast is None or len(args) <= split or not via.spec.varargs:
+            return args
+
+        values = args[split:]
+
+        try:
+            args[split:] = map(cast, values)
+        except (ValueError, TypeError, OverflowError):
+            failures = invalid(values, cast)
+            if not failures: raise
+            raise MalformedArguments("Invalid values for argument {0}. {1}".format(via.indexed,
+                    failure(cast, failures).args[0]))
+
+        return args
+
+    def vector(self, values, cast, name):
+        """Convert the values of the named argument to an array of the numeric typecast, reporting all invalid values."""
+
+        try:
+            return vector(values, cast)
+        except ValueError as e:
+            raise MalformedArguments("Invalid values for argument {0}. {1}".format(name, e.args[0]))
+
+    def stream(self, arguments, via, typecast=True):
+        """Lazily yield the remaining values from the cursor for the streamed argument of the given specification.
+
+        Options must precede streamed values; every following argument is a value.  If a delimiter was declared, a
+        value of "-", or the absence of any values, reads delimited values from standard input instead.  Typecasting
+        is applied to each value as it is reached, unless disabled.
+        """
+
+        cast = via.cast.get(via.streamed) if typecast else None
+        delimiter = via.delimiter
+        empty = True
+
+        for value in arguments:
+            empty = False
+
+            if value == '-' and delimiter is not None:
+                for value in delimited(sys.stdin, delimiter):
+                    if value: yield cast(value) if cast else value
 
-            if via.cast.get(arg, None) is boolean:
-                kwargs[arg] = self.transform(name=arg, value=not via.defaults.get(arg, False), via=via)
                 continue
 
-            kwargs[arg] = self.transform(name=arg, value=arguments.pop(), via=via)
+            yield cast(value) if cast else value
 
-        return args, kwargs, remainder
+        if empty and delimiter is not None:
+            for value in delimited(sys.stdin, delimiter):
+                if value: yield cast(value) if cast else value
 
     def transform(self, name, value, via):
         """Typecast and optionally utilize callbacks for the given argument."""
@@ -371,6 +934,13 @@ class Parser(object):
 
         callback = via.callbacks.get(name)
         if callback:
-            callback(value, via)
+            # Callbacks are the names of Parser methods, or callables given using the callbacks decorator.
+            callback = getattr(self, callback) if isinstance(callback, string) else callback
+
+            if 'callback' in self.hooks:
+                from .hooks import callback as fire
+                fire(self, callback, name, value, via)
+            else:
+                callback(value, via)
 
         return value
@@ -0,0 +1,134 @@
+# encoding: utf-8
+
+"""Instrumentation of a `Parser` for the handlers registered using `Parser.hook`.
+
+Instrumentation is installed upon a parser instance as handlers are registered, so parsers without handlers are not
+affected at all.  Handlers are called as `handler(parser, event, elapsed, *details)`, where `elapsed` is the time in
+seconds the event took (or None for the entry of a command), and the details vary by event:
+
+`built`
+	`(spec, )` once a specification has been built; cached specifications are not rebuilt.
+`expanded`
+	`(arg, via, tokens)` after a raw argument has been expanded into tokens.
+`transformed`
+	`(name, value, via, result)` after the value of an argument has been typecast and any callback fired.
+`callback`
+	`(name, value, via)` after the callback of an argument, such as `--help`, has been fired.
+`entered`
+	`(spec, target)` prior to calling the command, or instantiating the class command, at each level.
+`exited`
+	`(spec, target, result)` after the command returns, or the class command is instantiated.
+`exception`
+	`(exception, )` as an exception other than an exit escapes `Parser.execute`, timed from its start.
+"""
+
+from __future__ import unicode_literals
+
+import time
+
+from .exc import ExitException
+
+
+__all__ = ['events', 'instrument', 'built', 'callback']
+
+
+events = ('built', 'expanded', 'transformed', 'callback', 'entered', 'exited', 'exception')
+clock = getattr(time, 'perf_counter', time.time)
+
+
+def fire(parser, event, elapsed, *details):
+	for handler in parser.hooks.get(event, ()):
+		handler(parser, event, elapsed, *details)
+
+
+def expanded(parser, fn):
+	def expand(arg, via):
+		start = clock()
+		result = fn(arg, via)
+		fire(parser, 'expanded', clock() - start, arg, via, result)
+		return result
+	
+	return expand
+
+
+def transformed(parser, fn):
+	def transform(name, value, via):
+		start = clock()
+		result = fn(name, value, via)
+		fire(parser, 'transformed', clock() - start, name, value, via, result)
+		return result
+	
+	return transform
+
+
+def called(parser, fn):
+	def call(spec, target, args, kwargs):
+		fire(parser, 'entered', None, spec, target)
+		start = clock()
+		result = fn(spec, target, args, kwargs)
+		fire(parser, 'exited', clock() - start, spec, target, result)
+		return result
+	
+	return call
+
+
+def executed(parser, fn):
+	def execute(arguments):
+		start = clock()
+		
+		try:
+			return fn(arguments)
+		
+		except ExitException:
+			raise
+		
+		except Exception as e:
+			fire(parser, 'exception', clock() - start, e)
+			raise
+	
+	return execute
+
+
+# The methods wrapped to observe each event, if any, and the factory of the wrapper.
+wrappers = dict(
+		expanded = ('expand', expanded),
+		transformed = ('transform', transformed),
+		entered = ('call', called),
+		exited = ('call', called),
+		exception = ('execute', executed),
+	)
+
+
+def instrument(parser, event):
+	"""Install the instrumentation required to observe the given event upon the parser instance, if not already."""
+	
+	if event not in wrappers:
+		return
+	
+	name, factory = wrappers[event]
+	
+	if name in parser.__dict__:  # Already instrumented.
+		return
+	
+	setattr(parser, name, factory(parser, getattr(parser, name)))
+
+
+def built(parser, build, *args):
+	"""Build a specification using the given callable, firing the corresponding event."""
+	
+	start = clock()
+	spec = build(*args)
+	fire(parser, 'built', clock() - start, spec)
+	
+	return spec
+
+
+def callback(parser, fn, name, value, via):
+	"""Fire the callback of an argument, firing the corresponding event even if the callback exits."""
+	
+	start = clock()
+	
+	try:
+		fn(value, via)
+	finally:
+		fire(parser, 'callback', clock() - start, name, value, via)
@@ -0,0 +1,60 @@
+# encoding: utf-8
+
+"""Sub-commands declared by import path, imported only once selected."""
+
+from __future__ import unicode_literals
+
+from importlib import import_module
+
+
+__all__ = ['Lazy', 'load']
+
+
+def load(path):
+	"""Import and return the object referenced by a "package.module:attribute" path."""
+	
+	module, _, attribute = path.partition(':')
+	target = import_module(module)
+	
+	for name in attribute.split('.') if attribute else ():
+		target = getattr(target, name)
+	
+	return target
+
+
+class Lazy(object):
+	"""A sub-command of a class-based command, declared by its import path.
+	
+	The reference is only imported once the sub-command is selected; help summaries are drawn from the declared
+	documentation instead::
+	
+		class Admin(object):
+			migrate = Lazy('myapp.commands.migrate:migrate', "Apply pending database migrations.")
+	"""
+	
+	def __init__(self, path, doc=""):
+		self.path = path
+		self.__doc__ = doc
+	
+	def __repr__(self):
+		return "{0.__class__.__name__}({0.path!r})".format(self)
+	
+	def __get__(self, obj, cls=None):
+		if obj is None:
+			return self
+		
+		return self.resolve()
+	
+	def __call__(self, *args, **kw):
+		return self.resolve()(*args, **kw)
+	
+	def resolve(self):
+		"""Import the referenced object, if not already imported, and return it."""
+		
+		try:
+			return self.target
+		except AttributeError:
+			pass
+		
+		self.target = load(self.path)
+		return self.target
@@ -0,0 +1,181 @@
+# encoding: utf-8
+
+"""Memory-mapped numeric data files as argument values.
+
+Annotate an argument with an `Array` typecast to be passed the contents of the file named on the command line, rather
+than the name itself::
+
+	@annotate(samples=Array('d'))
+	def analyze(samples): ...
+	
+	def analyze(samples: Array('d', numpy=True)): ...
+
+NumPy (`.npy`) files and raw binary files are mapped read-only, not read: pages are loaded by the operating system only
+as they are accessed, so even very large inputs are available immediately, without copying.  The result is a
+`memoryview` of the mapped file, shaped as recorded by a NumPy file, or, if requested, a NumPy array
+(`numpy.load(mmap_mode='r')` or `numpy.memmap`).  Delimited text (`.csv` and `.tsv`) files can not be mapped; they
+are parsed line by line, in a single pass, into a compact two-dimensional array of one row per line.
+
+Requires Python 3.3 or later.
+"""
+
+from __future__ import unicode_literals
+
+import os
+import sys
+import mmap
+
+from ast import literal_eval
+from array import array
+from struct import unpack
+
+from .util import vector
+
+
+__all__ = ['Array', 'mapped']
+
+
+# The struct formats of the NumPy type descriptors representable by a memoryview, by kind and size.
+descriptors = {
+		'b1': '?', 'i1': 'b', 'u1': 'B',
+		'i2': 'h', 'u2': 'H', 'f4': 'f',
+		'i4': 'i', 'u4': 'I', 'f8': 'd',
+		'i8': 'q', 'u8': 'Q',
+	}
+
+native = '<' if sys.byteorder == 'little' else '>'
+
+
+def view(path):
+	"""Return a read-only memoryview of the bytes of the file at the given path, mapped rather than read."""
+	
+	with open(path, 'rb') as fh:
+		if not os.fstat(fh.fileno()).st_size:  # Empty files can not be mapped.
+			return memoryview(b'')
+		
+		return memoryview(mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ))
+
+
+def header(data):
+	"""Parse the header of the NumPy file format, returning the offset of the data, the descriptor, and the shape."""
+	
+	if data[:6].tobytes() != b'\x93NUMPY':
+		raise ValueError("Not a NumPy file.")
+	
+	if data[6] == 1:
+		size, = unpack('<H', data[8:10].tobytes())
+		offset = 10
+	else:
+		size, = unpack('<I', data[8:12].tobytes())
+		offset = 12
+	
+	meta = literal_eval(data[offset:offset + size].tobytes().decode('latin1'))
+	
+	if meta['fortran_order']:
+		raise ValueError("Fortran-ordered NumPy files require NumPy.")
+	
+	return offset + size, meta['descr'], tuple(meta['shape'])
+
+
+class Array(object):
+	"""A typecast of a path to a numeric data file, producing a memory-mapped array of its contents.
+	
+	The `typecode` (an `array` type code) describes the elements of raw binary files, and those parsed from delimited
+	text; NumPy files describe their own.  The format is determined by file extension: `.npy`, `.csv` (or another
+	`delimiter`), `.tsv`, otherwise raw binary.
+	"""
+	
+	__slots__ = ('typecode', 'delimiter', 'numpy')
+	
+	pathlike = True  # Offer filenames when completing.
+	
+	def __init__(self, typecode='d', delimiter=',', numpy=False):
+		self.typecode = typecode
+		self.delimiter = delimiter
+		self.numpy = numpy  # Produce NumPy arrays rather than memoryviews.
+	
+	def __call__(self, path):
+		extension = os.path.splitext(path)[1].lower()
+		
+		if extension == '.npy':
+			return self.npy(path)
+		
+		if extension in ('.csv', '.tsv'):
+			return self.delimited(path, '\t' if extension == '.tsv' else self.delimiter)
+		
+		return self.raw(path)
+	
+	def npy(self, path):
+		if self.numpy:
+			from numpy import load
+			return load(path, mmap_mode='r')
+		
+		data = view(path)
+		offset, descr, shape = header(data)
+		
+		order, kind = descr[0], descr[1:]
+		
+		if kind not in descriptors or (order not in ('|', '=', native) and kind[1:] != '1'):
+			raise ValueError("Unsupported NumPy type without NumPy: " + descr)
+		
+		return data[offset:].cast(descriptors[kind], shape)
+	
+	def raw(self, path):
+		if self.numpy:
+			from numpy import memmap, zeros
+			
+			if not os.path.getsize(path):
+				return zeros(0, self.typecode)
+			
+			return memmap(path, self.typecode, mode='r')
+		
+		data = view(path)
+		size = array(self.typecode).itemsize
+		
+		if len(data) % size:
+			raise ValueError("File size not a multiple of the element size, {0} bytes: {1}".format(size, path))
+		
+		return data.cast(self.typecode)
+	
+	def delimited(self, path, delimiter):
+		cast = float if self.typecode in 'fd' else int
+		values = array(self.typecode)
+		separator = delimiter.encode('ascii')
+		rows = columns = 0
+		
+		with open(path, 'rb') as fh:
+			for number, line in enumerate(fh, 1):
+				if not line.strip(): continue
+				
+				row = line.split(separator)
+				columns = columns or len(row)
+				
+				if len(row) != columns:
+					raise ValueError("Expected {0} values on line {1}, found {2}: {3}".format(columns, number, len(row), path))
+				
+				try:
+					values.extend(map(cast, row))
+				except (ValueError, OverflowError):
+					try:
+						vector([i.decode('ascii', 'replace').strip() for i in row], cast)
+					except ValueError as e:
+						raise ValueError("Line {0} of {1}. {2}".format(number, path, e.args[0]))
+					
+					raise
+				
+				rows += 1
+		
+		if self.numpy:
+			from numpy import frombuffer
+			return frombuffer(values, self.typecode).reshape(rows, columns)
+		
+		if not rows:  # Views can not be shaped with a zero dimension; an empty file is an empty, flat view.
+			return memoryview(values)
+		
+		return memoryview(values).cast('B').cast(self.typecode, (rows, columns))
+	
+	def __repr__(self):
+		return "Array({0!r})".format(self.typecode)
+
+
+mapped = Array()  # Double precision floating point values, as memoryviews.
@@ -0,0 +1,207 @@
+# encoding: utf-8
+
+"""Output of the iterables returned by commands."""
+
+from __future__ import unicode_literals
+
+import io
+import os
+import sys
+import errno
+
+from .util import errors
+
+
+__all__ = ['formats', 'iterable', 'stream', 'records', 'serialize']
+
+
+text = type('')
+formats = ('json', 'jsonl', 'csv', 'tsv')
+encoder = None  # The shared JSON encoder, constructed on first use.
+
+
+def iterable(value):
+	"""Determine if the value returned by a command should be streamed to standard output rather than an exit status."""
+	
+	return hasattr(value, '__iter__') and not isinstance(value, (bytes, text)) and not hasattr(value, 'keys')
+
+
+def stream(values, size=65536):
+	"""Write each value of the iterable to standard output through a large buffer, returning an exit status.
+	
+	Text (or any other non-binary) values are written as lines, as if printed.  Binary values are written verbatim,
+	permitting the output of binary data in chunks.  If the reader goes away (e.g. `| head`) further output is
+	silently discarded, the iterable closed, and the conventional status for SIGPIPE of 141 returned.
+	"""
+	
+	encoding = getattr(sys.stdout, 'encoding', None) or 'utf-8'
+	sys.stdout.flush()
+	
+	try:
+		descriptor = sys.stdout.fileno()
+	except (AttributeError, ValueError, io.UnsupportedOperation):  # Not backed by a file, e.g. captured by a test.
+		descriptor = None
+		raw = getattr(sys.stdout, 'buffer', None)
+		binary = raw.write if raw else lambda chunk: sys.stdout.write(chunk.decode(encoding, errors))
+		write = sys.stdout.write
+	else:
+		out = io.BufferedWriter(io.FileIO(descriptor, 'w', closefd=False), size)
+		binary = out.write
+		write = lambda chunk: out.write(chunk.encode(encoding, errors))
+	
+	lines = []
+	
+	try:
+		for value in values:
+			if isinstance(value, bytes):
+				if lines:
+					write("".join(lines))
+					del lines[:]
+				
+				binary(value)
+				continue
+			
+			lines.append(value if isinstance(value, text) else text(value))
+			lines.append("\n")
+			
+			if len(lines) >= 2048:
+				write("".join(lines))
+				del lines[:]
+		
+		if lines:
+			write("".join(lines))
+		
+		if descriptor is None:
+			sys.stdout.flush()
+		else:
+			out.flush()
+	
+	except (IOError, OSError) as e:
+		if e.errno != errno.EPIPE: raise
+		
+		if hasattr(values, 'close'):
+			values.close()
+		
+		if descriptor is not None:  # Prevent any further writes, including flushing at exit, from failing noisily.
+			null = os.open(os.devnull, os.O_WRONLY)
+			os.dup2(null, descriptor)
+			os.close(null)
+		
+		return 128 + 13  # SIGPIPE
+	
+	return 0
+
+
+def native(record):
+	"""Return the given record as a mapping if it is a named tuple, otherwise unaltered."""
+	
+	return record._asdict() if hasattr(record, '_asdict') else record
+
+
+def records(value):
+	"""Return an iterable of the records represented by the value returned by a command.
+	
+	A single mapping, named tuple, or scalar is one record; any other iterable yields the records.
+	"""
+	
+	if hasattr(value, 'keys') or hasattr(value, '_fields') or not iterable(value):
+		return (value, )
+	
+	return value
+
+
+def encode(value):
+	"""Fallback JSON serialization of values lacking a native representation."""
+	
+	if hasattr(value, '_asdict'):
+		return value._asdict()
+	
+	if hasattr(value, '__iter__'):
+		return list(value)
+	
+	return text(value)
+
+
+def jsonl(values):
+	"""Yield each record as a line of JSON."""
+	
+	global encoder
+	
+	if encoder is None:
+		from json import JSONEncoder
+		encoder = JSONEncoder(separators=(',', ':'), default=encode)
+	
+	serialize = encoder.encode
+	
+	for record in values:
+		yield serialize(native(record))
+
+
+def json(values):
+	"""Yield the lines of a JSON array of the records, one record per line, without first gathering them."""
+	
+	yield "["
+	
+	previous = None
+	
+	for line in jsonl(values):
+		if previous is not None:
+			yield previous + ","
+		
+		previous = line
+	
+	if previous is not None:
+		yield previous
+	
+	yield "]"
+
+
+def delimited(values, delimiter):
+	"""Yield each record as a line of delimited values, preceded by a header row if the records are mappings."""
+	
+	from csv import writer
+	
+	buffer = io.StringIO() if sys.version_info >= (3, ) else io.BytesIO()
+	row = writer(buffer, delimiter=str(delimiter), lineterminator=str('')).writerow
+	header = None
+	
+	for record in values:
+		record = native(record)
+		
+		if hasattr(record, 'keys'):
+			if header is None:
+				header = list(record.keys())
+				row(header)
+				yield buffer.getvalue()
+				buffer.seek(0)
+				buffer.truncate()
+			
+			record = [record.get(i, '') for i in header]
+		
+		elif not iterable(record):
+			record = [record]
+		
+		row(record)
+		yield buffer.getvalue()
+		buffer.seek(0)
+		buffer.truncate()
+
+
+def serialize(value, form, size=65536):
+	"""Write the records represented by the value in the named format to standard output, returning an exit status.
+	
+	Records are serialized and written incrementally, as they are produced; see `stream`.
+	"""
+	
+	values = records(value)
+	
+	if form == 'json':
+		lines = json(values)
+	elif form == 'jsonl':
+		lines = jsonl(values)
+	elif form in ('csv', 'tsv'):
+		lines = delimited(values, ',' if form == 'csv' else '\t')
+	else:
+		raise ValueError("Unknown output format: " + form)
+	
+	return stream(lines, size)
@@ -0,0 +1,166 @@
+# encoding: utf-8
+
+"""Fan-out of the variable positional arguments of a command across a pool of threads or processes.
+
+Commands opt in using the `parallel` decorator, gaining a `--jobs` (`-j`) option::
+
+	@parallel(pool='process', ordered=True, chunk=1)
+	def compress(level=6, *paths): ...
+
+The command is then called once per work item (or per chunk of `chunk` items), with any fixed positional and keyword
+arguments repeated.  Each call may return an exit status (an integer or None) or text (or bytes) to write to standard
+output; output is written in the order of the work items if `ordered`, otherwise as calls complete.  The exit status
+of the command is the greatest of those returned.
+
+Process pools require the command to be importable by name, i.e. defined at the top level of a module.
+
+Requires Python 3.2 or later.
+"""
+
+from __future__ import unicode_literals, print_function
+
+import os
+import sys
+import signal
+
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from .exc import MalformedArguments
+
+
+__all__ = ['cpus', 'fanout']
+
+
+def cpus():
+	"""Return the number of processors available to this process, respecting affinity and cgroup CPU quotas."""
+	
+	try:
+		count = len(os.sched_getaffinity(0))
+	except AttributeError:
+		count = os.cpu_count() or 1
+	
+	quota = None
+	
+	try:  # cgroup v2
+		with open('/sys/fs/cgroup/cpu.max') as fh:
+			limit, period = fh.read().split()[:2]
+		
+		if limit != 'max':
+			quota = float(limit) / float(period)
+	
+	except (IOError, OSError, ValueError):
+		try:  # cgroup v1
+			with open('/sys/fs/cgroup/cpu/cpu.cfs_quota_us') as fh:
+				limit = float(fh.read())
+			
+			with open('/sys/fs/cgroup/cpu/cpu.cfs_period_us') as fh:
+				period = float(fh.read())
+			
+			if limit > 0 and period > 0:
+				quota = limit / period
+		
+		except (IOError, OSError, ValueError):
+			pass
+	
+	if quota is not None:
+		count = min(count, max(1, int(-(-quota // 1))))  # Round partial processors up.
+	
+	return max(1, count)
+
+
+def ignore():
+	"""Initialize a worker process to ignore interrupts, leaving the parent to drain the pool."""
+	
+	signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def call(target, args, kwargs):
+	"""Call the target, returning its result, or an exit status if it exits or fails."""
+	
+	try:
+		return target(*args, **kwargs)
+	
+	except SystemExit as e:
+		return e.code if e.code is None or isinstance(e.code, int) else 1
+	
+	except Exception as e:
+		print("Uncaught exception:", repr(e), file=sys.stderr)
+		return os.EX_SOFTWARE
+
+
+def emit(result):
+	"""Write non-status results to standard output, returning the exit status represented by the result."""
+	
+	if result is None or isinstance(result, int):
+		return result or 0
+	
+	if isinstance(result, bytes):
+		out = getattr(sys.stdout, 'buffer', sys.stdout)
+		out.write(result)
+	else:
+		sys.stdout.write(result)
+	
+	sys.stdout.flush()
+	
+	return 0
+
+
+def fanout(target, args, kwargs, spec):
+	"""Call the target once per chunk of its variable positional arguments on a pool, returning the exit status.
+	
+	The number of workers is taken from the `jobs` keyword argument, defaulting to the number of available processors;
+	fewer than one is rejected as malformed.
+	An interrupt stops the submission of further work, waits for calls already running to finish, then exits with the
+	conventional status of 130.
+	"""
+	
+	options = spec.parallel
+	kwargs = dict(kwargs)
+	jobs = kwargs.pop('jobs', None)
+	
+	if jobs is None:
+		jobs = cpus()
+	elif jobs < 1:
+		raise MalformedArguments("--jobs must be positive.")
+	
+	split = len(spec.positional)
+	fixed, items = tuple(args[:split]), args[split:]
+	size = max(1, options.get('chunk', 1))
+	chunks = [fixed + tuple(items[i:i + size]) for i in range(0, len(items), size)]
+	
+	if options.get('pool', 'thread') == 'process':
+		executor = ProcessPoolExecutor(jobs, initializer=ignore) if sys.version_info >= (3, 7) else ProcessPoolExecutor(jobs)
+	else:
+		executor = ThreadPoolExecutor(jobs)
+	
+	status = 0
+	futures = []
+	
+	try:
+		for chunk in chunks:  # Submitted one at a time, so that those submitted may be cancelled if interrupted.
+			futures.append(executor.submit(call, target, chunk, kwargs))
+		
+		if options.get('ordered', True):
+			for future in futures:
+				status = max(status, emit(future.result()))
+		
+		else:
+			pending = set(futures)
+			
+			while pending:
+				done, pending = wait(pending, return_when=FIRST_COMPLETED)
+				
+				for future in done:
+					status = max(status, emit(future.result()))
+	
+	except KeyboardInterrupt:
+		for future in futures:
+			future.cancel()
+		
+		executor.shutdown(wait=True)
+		
+		return 128 + signal.SIGINT
+	
+	executor.shutdown(wait=True)
+	
+	return status
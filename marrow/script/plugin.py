@@ -0,0 +1,129 @@
+# encoding: utf-8
+
+"""Discovery of sub-commands contributed by installed packages through an entry point group.
+
+Discovered sub-commands are mounted lazily; their names and summaries are persisted in an index beneath the cache
+directory (see `marrow.script.cache`) which is rebuilt only when the set of installed distributions changes, as
+detected by the names and modification times of the distribution metadata within the directories on `sys.path`.
+"""
+
+from __future__ import unicode_literals
+
+import os
+import sys
+
+from .lazy import Lazy, load
+
+
+__all__ = ['entries', 'fingerprint', 'index', 'discover', 'mount']
+
+
+def entries(group):
+	"""Scan the metadata of installed distributions, returning (name, reference) pairs for the given group."""
+	
+	try:
+		from importlib.metadata import entry_points
+	except ImportError:  # pragma: no cover
+		from pkg_resources import iter_entry_points
+		return [(i.name, i.module_name + (':' + '.'.join(i.attrs) if i.attrs else '')) for i in iter_entry_points(group)]
+	
+	found = entry_points()
+	found = found.select(group=group) if hasattr(found, 'select') else found.get(group, ())
+	
+	return [(i.name, i.value) for i in found]
+
+
+def fingerprint():
+	"""Return a value that changes whenever distributions are installed into, or removed from, `sys.path`.
+	
+	Only distribution metadata (`.dist-info` and `.egg-info`) is considered, so that other changes, such as to files
+	within the working directory, do not invalidate the index.
+	"""
+	
+	result = []
+	
+	for path in sys.path:
+		if not path: continue  # The working directory, under -c or -m.
+		
+		try:
+			names = os.listdir(path)
+		except (IOError, OSError):  # Missing, or not a directory, such as a zip archive.
+			continue
+		
+		for name in sorted(names):
+			if not name.endswith(('.dist-info', '.egg-info')): continue
+			
+			try:
+				info = os.stat(os.path.join(path, name))
+			except (IOError, OSError):
+				continue
+			
+			result.append([path, name, getattr(info, 'st_mtime_ns', info.st_mtime)])
+	
+	return result
+
+
+def summarize(reference):
+	"""Import the referenced sub-command to determine the summary of its docstring."""
+	
+	from inspect import getdoc
+	from .util import partitionhelp
+	
+	try:
+		return " ".join(partitionhelp(getdoc(load(reference)))[0])
+	except Exception:  # A broken plugin must not prevent the discovery of others.
+		return ""
+
+
+def index(group):
+	"""Return a mapping of discovered sub-command names to (reference, summary) pairs, using the persisted index.
+	
+	Building the index imports every discovered sub-command once to determine its summary.
+	"""
+	
+	import json
+	from .cache import directory, version, write
+	
+	current = fingerprint()
+	path = os.path.join(directory(), "entry-points-{0}-{1}.json".format(version, group))
+	
+	try:
+		with open(path, 'r') as fh:
+			data = json.load(fh)
+		
+		if data.get('fingerprint') == current:
+			return data['commands']
+	
+	except (IOError, OSError, ValueError):
+		pass
+	
+	commands = dict((name, [reference, summarize(reference)]) for name, reference in entries(group))
+	write(path, dict(fingerprint=current, commands=commands))
+	
+	return commands
+
+
+def discover(group):
+	"""Return a mapping of the names of sub-commands contributed to the given entry point group to `Lazy` references."""
+	
+	return dict((name, Lazy(reference, summary)) for name, (reference, summary) in index(group).items())
+
+
+def mount(group):
+	"""Class decorator mounting the sub-commands contributed to an entry point group upon a class-based command.
+	
+	Sub-commands defined by the class itself take precedence::
+	
+		@mount('mytool.commands')
+		class MyTool(object):
+			def version(self): ...
+	"""
+	
+	def decorator(cls):
+		for name, command in discover(group).items():
+			if not hasattr(cls, name):
+				setattr(cls, name, command)
+		
+		return cls
+	
+	return decorator
@@ -2,111 +2,143 @@
 
 from __future__ import unicode_literals, print_function
 
-from collections import namedtuple
-from inspect import isclass, isfunction, ismethod, getdoc
+from collections import namedtuple, OrderedDict
+from inspect import isclass, isfunction, getdoc
 
-from marrow.schema import Attribute, CallbackAttribute, Attributes
-from marrow.schema.meta import ElementMeta
-from marrow.schema.validate import always
-from marrow.schema.transform import Transform, IngressTransform
+from marrow.schema import Attribute
 
 from .compat import signature, Parameter
+from .util import elementwise
+from .typecast import resolve, memoize
 
 
-context = namedtuple("context", ('attribute', 'container'))
 nodefault = object()
 
 
-class Argument(Attribute):
-	default = Attribute(default=nodefault)
-	short = Attribute(default=None)
-	description = Attribute(default=None)
-	transform = CallbackAttribute(default=Transform())
-	validator = CallbackAttribute(default=always)
+def switch(value):
+	"""Interpret the given value as a toggle."""
+	
+	if hasattr(value, 'lower'):
+		value = value.lower()
+	
+	return value in (True, 'yes', 'y', 'true', 't', 'on')
+
+
+class Argument(object):
+	"""The definition of an argument: its default, typecast, validator, and description.
+	
+	Definitions are immutable and, when created through `Argument.shared`, interned: every parameter defined identically
+	refers to the same instance.  The name and abbreviation of a parameter are held by its `Specification` instead.
+	"""
+	
+	__slots__ = ('default', 'transform', 'validator', 'description')
+	
+	interned = dict()  # Shared definitions, keyed by class and attribute values.
+	
+	def __init__(self, default=nodefault, transform=None, validator=None, description=None):
+		self.default = default
+		self.transform = transform  # A callable typecasting the given value, or None.
+		self.validator = validator  # A callable returning the value if valid, raising otherwise, or None.
+		self.description = description
 	
 	@classmethod
-	def from_inspect(cls, arg, reserved=None):
-		"""Create a new instance from an `inspect.Argument` as provided by `inspect.signature`.
+	def shared(cls, default=nodefault, transform=None, validator=None, description=None):
+		"""Return the shared definition with the given attributes, constructing it on first use.
 		
-		To automatically calculate the argument abbreviation pass in a set of existing abbreviations as `reserved`.
+		Definitions whose default values can not be hashed are not shared.
 		"""
 		
-		if arg.kind is Parameter.VAR_POSITIONAL:  # Handle the `*args` construct.
-			return cls(arg.name, default=tuple)
+		key = (cls, type(default), default, transform, validator, description)
+		
+		try:
+			return cls.interned[key]
+		except KeyError:
+			argument = cls.interned[key] = cls(default, transform, validator, description)
+			return argument
+		except TypeError:
+			return cls(default, transform, validator, description)
+	
+	@classmethod
+	def from_inspect(cls, arg):
+		"""Return the shared definition of an `inspect.Parameter` as provided by `inspect.signature`."""
+		
+		if arg.kind is Parameter.VAR_POSITIONAL:  # Handle the `*args` construct, each value converted in one pass.
+			hint = None if arg.annotation is Parameter.empty else arg.annotation
+			hint = hint[0] if isinstance(hint, tuple) else None if isinstance(hint, str) else hint
+			
+			try:
+				transform = resolve(hint)
+			except TypeError:
+				raise TypeError("Invalid annotation for argument: " + arg.name)
+			
+			return Argument.shared(default=(), transform=elementwise(transform) if transform else None)
 		
 		if arg.kind is Parameter.VAR_KEYWORD:  # Handle the `**kwargs` construct.
-			return cls(arg.name, default=dict)
+			return Argument.shared(default=())
 		
 		if isinstance(arg.annotation, Argument):  # Explicit Argument annotation makes life easy.
 			return arg.annotation
 		
-		cast = False
-		argument = cls(arg.name)
+		hint = description = None
 		
 		if arg.annotation is not Parameter.empty:
-			if callable(arg.annotation):
-				argument.transform = IngressTransform(arg.annotation)
-				cast = True
-			
-			elif isinstance(arg.annotation, str):
-				argument.description = arg.annotation
+			if isinstance(arg.annotation, str):
+				description = arg.annotation
 			
 			elif isinstance(arg.annotation, tuple):
-				argument.transform = IngressTransform(arg.annotation[0])
-				argument.description = arg.annotation[1]
-				cast = True
+				hint, description = arg.annotation[:2]
 			
 			else:
-				raise TypeError("Invalid annotation for argument: " + arg.name)
+				hint = arg.annotation
 		
-		if arg.default is not Parameter.empty:
-			if not cast and arg.default is not None:  # Simple inference given no explicit typecast callback.
-				argument.transform = IngressTransform(type(arg.default))  # XXX: We might want a registry?
-			
-			argument.default = arg.default
+		default = nodefault if arg.default is Parameter.empty else arg.default
 		
-		# Determine acceptable (unique) short code.
-		if reserved:
-			for char in arg.name:
-				for letter in (char.lower(), char.upper()):
-					if letter in reserved: continue
-					argument.short = letter
-					reserved.add(letter)
-					return argument
+		if hint is bool or isinstance(default, bool):
+			cls = Switch
+			transform = None
 		
-		return argument
-	
-	def __repr__(self):
-		return "{0.__class__.__name__}({1}{0.__name__}{2})".format(
-				self,
-				(self.short + ':') if self.short else '',
-				', required' if self.default is nodefault else ''
-			)
+		else:
+			try:  # Resolve the converter of the annotation, or infer one from the default value.
+				transform = resolve(hint, None if default is nodefault else default)
+			except TypeError:
+				raise TypeError("Invalid annotation for argument: " + arg.name)
+		
+		return cls.shared(default, transform, None, description)
 	
-	def __set__(self, obj, value):
-		ctx = context(self, obj)
+	def native(self, value):
+		"""Typecast and validate the given value."""
+		
+		if self.transform is not None:
+			value = self.transform(value)
 		
-		value = self.transform.native(value, ctx)
-		value = self.validator.validate(value, ctx)
+		if self.validator is not None:
+			value = self.validator(value)
 		
-		super(Argument, self).__set__(obj, value)
+		return value
+	
+	def __repr__(self):
+		return "{0.__class__.__name__}({1})".format(self, 'required' if self.default is nodefault else repr(self.default))
 
 
-class SwitchTransform(Transform):
-	def native(self, value, context):
-		if hasattr(value, 'lower'):
-			value = value.lower()
+class Switch(Argument):
+	__slots__ = ()
+	
+	def native(self, value):
+		value = switch(value)
 		
-		if value in (True, 'yes', 'y', 'true', 't', 'on'):
-			return context.attribute.truthy
+		if self.validator is not None:
+			value = self.validator(value)
 		
-		return context.attribute.falsy
+		return value
 
 
-class Switch(Argument):
-	transform = CallbackAttribute(default=SwitchTransform())
-	truthy = CallbackAttribute(default=True)
-	falsy = CallbackAttribute(default=False)
+class Field(namedtuple('Field', ('name', 'short', 'argument'))):
+	"""A view of a single parameter of a specification, exposing the attributes of its definition."""
+	
+	__slots__ = ()
+	
+	def __getattr__(self, name):
+		return getattr(self.argument, name)
 
 
 class Command(Attribute):
@@ -141,78 +173,170 @@ class Command(Attribute):
 		return self
 
 
-class Specification(Attribute):
-	__arguments__ = Attributes(Argument)
-	__commands__ = Attributes(Command)
-	_vargs = Attribute(default=False)
-	_kwargs = Attribute(default=False)
+class Specification(object):
+	"""The compact specification of the arguments of a callable.
 	
-	def apply(self):
-		"""Return a 2-tuple of (args, kw) in preparation for execution using these arguments."""
-		
-		seen = set()
-		positional = []
-		keyword = {}
-		
-		for arg, spec in self.__arguments__.items():
-			if spec.default is nodefault:
-				if arg == self._vargs:
-					continue  # TEST: vargs
-				
-				positional.append(getattr(self, arg))
-				seen.add(arg)
-				continue
-			
-			if arg == self._kwargs:
-				continue  # TEST: kwargs
-			
-			keyword[arg] = getattr(self, arg)
-			seen.add(arg)
+	Parameters are held in parallel tables (tuples) of names, abbreviations, and shared `Argument` definitions, along
+	with the precomputed layout of positional and keyword arguments used by `apply`.  Call a specification to create
+	an empty set of `Arguments` to populate.
+	"""
+	
+	__slots__ = ('_names', '_shorts', '_arguments', '_index', '_positional', '_keyword', '_defaults', '_vargs',
+			'_kwargs', '__weakref__')
+	
+	def __init__(self, names, shorts, arguments, positional, vargs=False, kwargs=False):
+		"""Construct a specification from its tables, and the indexes of the positional arguments within them."""
+		
+		self._names = tuple(names)
+		self._shorts = tuple(shorts)
+		self._arguments = tuple(arguments)
+		self._index = dict((name, i) for i, name in enumerate(self._names))
+		self._defaults = tuple(i.default for i in self._arguments)
+		self._vargs = vargs
+		self._kwargs = kwargs
+		
+		special = (self._index.get(vargs), self._index.get(kwargs))
+		self._positional = tuple(positional)
+		self._keyword = tuple(i for i in range(len(self._names)) if i not in self._positional and i not in special)
+	
+	@property
+	def __arguments__(self):
+		"""An ordered mapping of parameter names to `Field` views."""
 		
-		if self._vargs:  # TEST: vargs
-			positional.extend(getattr(self, self._vargs))
+		return OrderedDict((name, Field(name, short, argument)) for name, short, argument in
+				zip(self._names, self._shorts, self._arguments))
+	
+	def __getattr__(self, name):
+		if name in Specification.__slots__:  # Not yet assigned.
+			raise AttributeError(name)
 		
-		if self._kwargs:  # TEST: kwargs
-			# TODO: Identify redefinition and explode.
-			keyword.update(getattr(self, self._kwargs))
+		try:
+			i = self._index[name]
+		except KeyError:
+			raise AttributeError(name)
 		
-		return tuple(positional), keyword
+		return Field(name, self._shorts[i], self._arguments[i])
+	
+	def __call__(self):
+		return Arguments(self)
 	
 	@classmethod
 	def from_object(cls, obj, parent=None):
-		"""Construct a new Specification subclass dedicated to this function."""
-		
-		# It's gettin' weird, Jerry.
+		"""Construct the specification of the given callable, or return the one previously constructed."""
 		
 		# If we have no hope, bail early.
 		if not callable(obj):
-			raise TypeError("Invalid target for spcification: " + repr(obj))
+			raise TypeError("Invalid target for specification: " + repr(obj))
 		
-		# An existing class is a handy shortcut.
-		if hasattr(obj, '__script_spec_class__'):
-			return obj.__script_spec_class__
+		# An existing specification is a handy shortcut; classes must not inherit that of their parent.
+		existing = getattr(obj, '__dict__', dict()).get('__script_spec__')
+		if existing is not None:
+			return existing
 		
-		parts = dict()
-		shorts = set()
-		
-		# Inspect and populate a new schema for this callable.
+		try:
+			parameters = signature(obj).parameters.values()
+		except ValueError:  # Built-in callables, such as the initializer of object, may lack a signature.
+			parameters = ()
 		
-		sig = signature(obj)
+		names, shorts, arguments, positional = [], [], [], []
+		vargs = kwargs = False
+		reserved = set()
 		
-		for arg in sig.parameters:
-			if arg.kind is Parameter.VAR_POSITIONAL:  # Handle the `*args` construct.
-				parts['_vargs'] = arg.name
+		for arg in parameters:
+			if arg.kind is Parameter.VAR_POSITIONAL:
+				vargs = arg.name
+			
+			elif arg.kind is Parameter.VAR_KEYWORD:
+				kwargs = arg.name
+			
+			elif arg.default is Parameter.empty and arg.kind is not Parameter.KEYWORD_ONLY:
+				positional.append(len(names))
+			
+			argument = Argument.from_inspect(arg)
+			short = None
 			
-			elif arg.kind is Parameter.VAR_KEYWORD:  # Handle the `**kwargs` construct.
-				parts['_kwargs'] = arg.name
+			# Pure transforms, including those of each variable positional argument, are memoized per specification.
+			transform = argument.transform
+			element = getattr(transform, 'cast', None)
 			
-			arg_cls = Switch if arg.annotation is bool or isinstance(arg.default, bool) else Argument
-			parts[arg.name] = arg_cls.from_inspect(arg, reserved=shorts)
+			if getattr(element or transform, '_cmd_pure', None):
+				transform = elementwise(memoize(element), False) if element else memoize(transform)
+				argument = argument.__class__(argument.default, transform, argument.validator, argument.description)
+			
+			# Determine an acceptable (unique) abbreviation for options.
+			if argument.default is not nodefault and arg.kind not in (Parameter.VAR_POSITIONAL, Parameter.VAR_KEYWORD):
+				for letter in (i for char in arg.name for i in (char.lower(), char.upper())):
+					if letter in reserved: continue
+					short = letter
+					reserved.add(letter)
+					break
+			
+			names.append(arg.name)
+			shorts.append(short)
+			arguments.append(argument)
 		
-		# Construct the final class.
-		spec = ElementMeta(obj.__name__.title() + "Specification", (Specification, ), parts)
+		spec = cls(names, shorts, arguments, positional, vargs, kwargs)
 		
 		# Cache if possible.
-		obj.__script_spec_class__ = spec
+		try:
+			obj.__script_spec__ = spec
+		except AttributeError:
+			pass
 		
 		return spec
+
+
+class Arguments(object):
+	"""The values of the arguments of a `Specification`, held in a table parallel to its own."""
+	
+	__slots__ = ('__specification__', '__data__')
+	
+	def __init__(self, specification):
+		object.__setattr__(self, '__specification__', specification)
+		object.__setattr__(self, '__data__', list(specification._defaults))
+	
+	def __getattr__(self, name):
+		spec = self.__specification__
+		
+		try:
+			value = self.__data__[spec._index[name]]
+		except KeyError:
+			raise AttributeError(name)
+		
+		if value is nodefault:
+			raise AttributeError(name)
+		
+		return value
+	
+	def __setattr__(self, name, value):
+		spec = self.__specification__
+		
+		try:
+			i = spec._index[name]
+		except KeyError:
+			raise AttributeError(name)
+		
+		self.__data__[i] = spec._arguments[i].native(value)
+	
+	def apply(self):
+		"""Return a 2-tuple of (args, kw) in preparation for execution using these arguments."""
+		
+		spec = self.__specification__
+		data = self.__data__
+		names = spec._names
+		
+		for i in spec._positional + spec._keyword:
+			if data[i] is nodefault:
+				raise TypeError("Missing required argument: " + names[i])
+		
+		positional = [data[i] for i in spec._positional]
+		keyword = dict((names[i], data[i]) for i in spec._keyword)
+		
+		if spec._vargs:
+			positional.extend(data[spec._index[spec._vargs]])
+		
+		if spec._kwargs:
+			# TODO: Identify redefinition and explode.
+			keyword.update(data[spec._index[spec._kwargs]])
+		
+		return tuple(positional), keyword
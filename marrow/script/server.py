@@ -0,0 +1,263 @@
+# encoding: utf-8
+
+"""A warm command server accepting invocations over a local Unix domain socket.
+
+The server imports the command and keeps its `Parser` warm; each invocation carries the argument list, environment, and
+working directory of the client, along with the client's standard input, output, and error file descriptors, passed
+using `SCM_RIGHTS`.  Invocations are executed one at a time within the server process, or concurrently in forked
+children of it.  See `marrow.script.client` for the client side.
+
+Requires Python 3.3 or later.
+"""
+
+from __future__ import unicode_literals, print_function
+
+import gc
+import io
+import os
+import sys
+import stat
+import signal
+import struct
+import socket
+
+from array import array
+from json import loads
+from contextlib import closing
+
+from .batch import invoke
+
+
+__all__ = ['serve']
+
+
+header = struct.Struct('!I')  # The length of the JSON-encoded request that follows.
+status = struct.Struct('!i')  # The exit status returned to the client.
+
+
+def receive(connection):
+	"""Receive a single request and the file descriptors accompanying it."""
+	
+	fds = array('i')
+	data, ancillary, flags, address = connection.recvmsg(header.size, socket.CMSG_SPACE(3 * fds.itemsize))
+	
+	for level, kind, payload in ancillary:
+		if level == socket.SOL_SOCKET and kind == socket.SCM_RIGHTS:
+			fds.frombytes(payload[:len(payload) - (len(payload) % fds.itemsize)])
+	
+	data = recvall(connection, header.size - len(data), data)
+	length, = header.unpack(data)
+	
+	return loads(recvall(connection, length).decode('utf-8')), list(fds)
+
+
+def recvall(connection, length, data=b''):
+	while length:
+		chunk = connection.recv(length)
+		if not chunk: raise EOFError("Connection closed mid-request.")
+		data += chunk
+		length -= len(chunk)
+	
+	return data
+
+
+def run(parser, request, fds):
+	"""Execute a single request, temporarily adopting the client's file descriptors, environment, and directory."""
+	
+	saved = [os.dup(i) for i in range(3)]
+	streams = sys.stdin, sys.stdout, sys.stderr
+	cwd = os.getcwd()
+	environ = dict(os.environ)
+	
+	sys.stdout.flush()
+	sys.stderr.flush()
+	
+	try:
+		# Replace the descriptors themselves so that child processes inherit them, too.
+		for fd, target in zip(fds, range(3)):
+			os.dup2(fd, target)
+		
+		sys.stdin = io.open(0, 'r', closefd=False)
+		sys.stdout = io.open(1, 'w', closefd=False)
+		sys.stderr = io.open(2, 'w', closefd=False)
+		parser.resized()  # The width cached from a previous client's terminal does not apply; nor is it signalled.
+		
+		os.environ.clear()
+		os.environ.update(request['env'])
+		os.chdir(request['cwd'])
+		
+		result = invoke(parser, request['argv']) or 0
+		return result if isinstance(result, int) else 1
+	
+	finally:
+		for stream in (sys.stdout, sys.stderr):
+			try:
+				stream.flush()
+			except (IOError, OSError):
+				pass  # E.g. the client's output was a pipe closed early.
+		
+		sys.stdin, sys.stdout, sys.stderr = streams
+		
+		for fd, target in zip(saved, range(3)):
+			os.dup2(fd, target)
+			os.close(fd)
+		
+		for fd in fds:
+			os.close(fd)
+		
+		os.chdir(cwd)
+		os.environ.clear()
+		os.environ.update(environ)
+
+
+def reap(signum=None, frame=None):
+	"""Collect the exit status of any finished child processes."""
+	
+	try:
+		while os.waitpid(-1, os.WNOHANG)[0]:
+			pass
+	
+	except ChildProcessError:
+		pass
+
+
+def validate(request):
+	"""Return a description of the problem with the given request, or None if it is acceptable."""
+	
+	if not isinstance(request, dict):
+		return "Malformed request."
+	
+	argv, env, cwd = request.get('argv'), request.get('env'), request.get('cwd')
+	
+	if not isinstance(argv, list) or not all(isinstance(i, type('')) for i in argv):
+		return "Malformed argument list."
+	
+	if not isinstance(env, dict) or not all(isinstance(i, type('')) for pair in env.items() for i in pair):
+		return "Malformed environment."
+	
+	if not isinstance(cwd, type('')) or not os.path.isdir(cwd):
+		return "Working directory not found: " + repr(cwd)
+
+
+def respond(parser, connection):
+	"""Receive, execute, and answer a single request on the given connection.
+	
+	Invalid requests, and failures to adopt the state of the client, are reported to the client as a non-zero exit
+	status rather than allowed to stop the server.
+	"""
+	
+	try:
+		request, fds = receive(connection)
+	except (EOFError, ValueError, KeyError):
+		return
+	
+	problem = validate(request)
+	
+	if problem is not None:
+		print("Rejected request:", problem, file=sys.stderr)
+		
+		for fd in fds:
+			os.close(fd)
+		
+		result = os.EX_USAGE
+	
+	else:
+		try:
+			result = run(parser, request, fds)
+		except Exception as e:
+			print("Failed request:", repr(e), file=sys.stderr)
+			result = os.EX_SOFTWARE
+	
+	connection.sendall(status.pack(result))
+
+
+def stale(path):
+	"""Determine if the given path is a socket no server is listening on, and so safe to remove."""
+	
+	try:
+		if not stat.S_ISSOCK(os.lstat(path).st_mode):
+			return False
+	except OSError:
+		return False
+	
+	probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+	
+	try:
+		probe.connect(path)
+	except socket.error:
+		return True
+	finally:
+		probe.close()
+	
+	return False
+
+
+def serve(parser, path, backlog=16, fork=False):
+	"""Accept and execute invocations on the Unix domain socket at the given path until interrupted.
+	
+	The socket is only accessible to the user running the server, as connecting to it permits arbitrary invocation.
+	
+	If `fork` is truthy the server acts as a "zygote": the full command tree is compiled, the heap frozen (Python 3.7+)
+	and a child process forked for each invocation, sharing the preloaded state copy-on-write.  Invocations then run
+	concurrently, each beginning directly at argument parsing.
+	"""
+	
+	if stale(path):
+		os.unlink(path)  # Clean up a socket left behind by a previous server; anything else is left for bind to reject.
+	
+	server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+	bound = False
+	
+	if fork:
+		parser.preload()
+		signal.signal(signal.SIGCHLD, reap)
+		gc.disable()  # Collections in the parent would dirty otherwise shared pages.
+	
+	try:
+		mask = os.umask(0o177)  # Created accessible only to the owner, never briefly otherwise.
+		
+		try:
+			server.bind(path)
+			bound = True
+		finally:
+			os.umask(mask)
+		
+		server.listen(backlog)
+		
+		while True:
+			connection, _ = server.accept()
+			
+			if fork:
+				if hasattr(gc, 'freeze'):
+					gc.freeze()
+				
+				if os.fork():
+					connection.close()
+					continue
+				
+				try:  # pragma: no cover
+					signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+					server.close()
+					gc.enable()
+					
+					with closing(connection):
+						respond(parser, connection)
+				
+				finally:  # pragma: no cover
+					os._exit(0)
+			
+			try:
+				with closing(connection):
+					respond(parser, connection)
+			
+			except Exception as e:  # E.g. the client went away; the server must outlive any single request.
+				print("Failed request:", repr(e), file=sys.stderr)
+	
+	except KeyboardInterrupt:
+		return 0
+	
+	finally:
+		server.close()
+		
+		if bound and os.path.exists(path):
+			os.unlink(path)
@@ -0,0 +1,194 @@
+# encoding: utf-8
+
+"""Measurement of the phases of an invocation, activated by environment variables.
+
+`MARROW_SCRIPT_TIMINGS`
+	If set, report the wall and CPU time spent within each phase on standard error at exit: interpreter startup and
+	imports, specification building, expansion, argument processing (including transformation and callbacks), the
+	instantiation of each class command, the command itself, other framework work (such as writing streamed output),
+	and teardown.  Time is attributed exclusively; nested phases are not double-counted.  Teardown covers the exit
+	handlers registered during the invocation, e.g. by the command, which run before the report; handlers registered
+	beforehand (such as at import) and the final interpreter shutdown can not be measured from within.  The hits and
+	misses of memoized (pure) transforms follow, if any were used.
+
+`MARROW_SCRIPT_PROFILE`
+	If set, profile the invocation using `cProfile`, writing statistics to the named file, e.g. `out.pstats`.
+"""
+
+from __future__ import unicode_literals, print_function
+
+import os
+import sys
+import time
+
+
+__all__ = ['Timings', 'measure']
+
+
+clock = getattr(time, 'perf_counter', time.time)
+cpu = getattr(time, 'process_time', None) or time.clock
+
+
+def uptime():
+	"""Return the wall time elapsed since the start of this process, if determinable, otherwise None."""
+	
+	try:
+		with open('/proc/self/stat') as fh:
+			started = float(fh.read().rpartition(')')[2].split()[19]) / os.sysconf(str('SC_CLK_TCK'))
+		
+		with open('/proc/uptime') as fh:
+			return float(fh.read().split()[0]) - started
+	
+	except (IOError, OSError, ValueError, IndexError, AttributeError):
+		return None
+
+
+class Timings(object):
+	"""Accumulate the exclusive wall and CPU time spent within named phases."""
+	
+	def __init__(self):
+		self.order = []
+		self.totals = dict()
+		self.stack = []
+	
+	def add(self, name, wall, processor):
+		"""Attribute the given wall and CPU time to the named phase."""
+		
+		totals = self.totals.get(name)
+		
+		if totals is None:
+			self.order.append(name)
+			totals = self.totals[name] = [0.0, 0.0]
+		
+		totals[0] += wall
+		totals[1] += processor
+	
+	def wrap(self, name, fn):
+		"""Return a wrapper around the callable attributing the time spent within it, less nested phases, to a phase.
+		
+		The name may be a callable, called with the arguments of each call to determine the phase name.
+		"""
+		
+		def wrapper(*args, **kw):
+			nested = [0.0, 0.0]
+			self.stack.append(nested)
+			wall, processor = clock(), cpu()
+			
+			try:
+				return fn(*args, **kw)
+			
+			finally:
+				wall, processor = clock() - wall, cpu() - processor
+				self.stack.pop()
+				
+				if self.stack:
+					self.stack[-1][0] += wall
+					self.stack[-1][1] += processor
+				
+				self.add(name(*args, **kw) if callable(name) else name, wall - nested[0], processor - nested[1])
+		
+		return wrapper
+	
+	def report(self, stream=None):
+		"""Write a table of the accumulated phases to the given stream, standard error by default."""
+		
+		stream = sys.stderr if stream is None else stream
+		width = max([len(i) for i in self.order] + [5])
+		lines = ["%-*s  %10s  %10s\n" % (width, "Phase", "Wall (ms)", "CPU (ms)")]
+		
+		for name in self.order:
+			wall, processor = self.totals[name]
+			lines.append("%-*s  %10.3f  %10.3f\n" % (width, name, wall * 1000, processor * 1000))
+		
+		stream.write("".join(lines))
+		stream.flush()
+
+
+def memoized(parser, stream=None):
+	"""Write a table of the hits and misses of the memoized transforms of the specifications used, if any."""
+	
+	stream = sys.stderr if stream is None else stream
+	rows = []
+	
+	for spec in parser.stack:
+		for name in sorted(spec.cast):
+			info = getattr(spec.cast[name], 'cache_info', None)
+			if info is None: continue
+			
+			info = info()
+			rows.append((name, info.hits, info.misses, info.currsize))
+	
+	if not rows:
+		return
+	
+	width = max([len(i[0]) for i in rows] + [9])
+	lines = ["%-*s  %10s  %10s  %10s\n" % (width, "Transform", "Hits", "Misses", "Cached")]
+	lines.extend("%-*s  %10d  %10d  %10d\n" % ((width, ) + row) for row in rows)
+	
+	stream.write("".join(lines))
+	stream.flush()
+
+
+def phase(spec, target, args, kwargs):
+	"""Determine the name of the phase of a call to `Parser.call`."""
+	
+	return ("instantiate " + spec.target.__name__) if spec.cls else "command"
+
+
+def measure(parser, arguments):
+	"""Invoke the parser with the given argument list, timing and profiling according to the environment."""
+	
+	import atexit
+	
+	path = os.environ.get('MARROW_SCRIPT_PROFILE')
+	timings = Timings() if os.environ.get('MARROW_SCRIPT_TIMINGS') else None
+	
+	if timings:
+		elapsed = uptime()
+		timings.add("startup and import", elapsed or 0.0, cpu())
+		finished = []
+		
+		def teardown():
+			if finished:
+				timings.add("teardown", clock() - finished[0], cpu() - finished[1])
+			
+			timings.report()
+			memoized(parser)
+		
+		# Exit handlers run in reverse order of registration; registered first, the report runs after any registered
+		# by the command.
+		atexit.register(teardown)
+		
+		# Instance attributes shadow the methods (or instrumentation; see hook) for this invocation only.
+		saved = dict((i, parser.__dict__.get(i)) for i in ('compile', 'expand', 'arguments', 'call'))
+		parser.compile = timings.wrap("specification", parser.compile)
+		parser.expand = timings.wrap("expand", parser.expand)
+		parser.arguments = timings.wrap("arguments", parser.arguments)
+		parser.call = timings.wrap(phase, parser.call)
+		dispatch = timings.wrap("other", parser.dispatch)
+	
+	else:
+		dispatch = parser.dispatch
+	
+	try:
+		if path:
+			from cProfile import Profile
+			
+			profile = Profile()
+			
+			try:
+				return profile.runcall(dispatch, arguments)
+			finally:
+				profile.dump_stats(path)
+		
+		return dispatch(arguments)
+	
+	finally:
+		if timings:
+			for name, value in saved.items():
+				if value is None:
+					del parser.__dict__[name]
+				else:
+					parser.__dict__[name] = value
+			
+			finished.extend((clock(), cpu()))
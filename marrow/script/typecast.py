@@ -0,0 +1,265 @@
+# encoding: utf-8
+
+"""Resolution of annotations and default values to typecasting callbacks.
+
+Converters are produced by factories registered against the qualified name of a type (matched against the type and
+its bases, so `Enum` subclasses are covered by the factory for `enum.Enum`) or of a `typing` construct.  Each factory
+is passed the type (or the origin of a generic) and any type arguments, returning a converter specialized for them,
+e.g. `List[int]` produces a converter splitting a comma-separated value and casting each element to an integer.
+Types without a registered factory, such as `int`, `float`, or `pathlib.Path`, are their own converters.
+
+Resolution happens once per annotation; the resulting converters are shared by every specification using it.  Types
+are identified by name so that the modules defining them need not be imported until they are annotated with.
+
+Register additional factories with the `register` decorator::
+
+	@register('ipaddress.IPv4Address')
+	def address(kind, args):
+		return kind
+
+Converters whose result depends only on the value given, such as those parsing URLs or resolving paths, may be marked
+`pure`.  Each specification then memoizes the results of such converters using a bounded LRU cache, so that repeated
+values (common amongst long lists of variable positional arguments) are converted only once.  Hit and miss statistics
+are available through the `cache_info` method of the memoized converter, and are reported with timings.
+"""
+
+from __future__ import unicode_literals
+
+from .util import boolean, array
+
+try:
+	from functools import lru_cache
+except ImportError:  # pragma: no cover
+	lru_cache = None
+
+
+__all__ = ['register', 'resolve', 'pure', 'memoize']
+
+
+registry = dict()  # Converter factories, by qualified name.
+resolved = dict()  # Converters previously resolved, by annotation.
+missing = object()
+
+
+def qualified(kind):
+	"""Return the qualified name of a type or `typing` construct, as used by the registry."""
+	
+	if isinstance(kind, type):
+		return kind.__module__.replace('__builtin__', 'builtins') + '.' + kind.__name__
+	
+	return repr(kind)  # e.g. typing.Union, typing.Literal
+
+
+def register(*kinds):
+	"""Register the decorated factory for the given types or qualified names."""
+	
+	def decorator(factory):
+		for kind in kinds:
+			registry[kind if isinstance(kind, type('')) else qualified(kind)] = factory
+		
+		resolved.clear()
+		
+		return factory
+	
+	return decorator
+
+
+def resolve(hint=None, default=missing):
+	"""Return the converter of the given annotation, or that inferred from a default value, or None if neither apply.
+	
+	Callables lacking a registered factory, such as typecasting functions, are their own converters.  Annotations
+	which are neither callable nor supported raise a `TypeError`.
+	"""
+	
+	if hint is None:
+		if default is missing or default is None:
+			return None
+		
+		hint = list if isinstance(default, (list, tuple)) else type(default)
+	
+	try:
+		return resolved[hint]
+	except KeyError:
+		pass
+	except TypeError:  # Unhashable, e.g. some Literal choices.
+		return construct(hint)
+	
+	converter = construct(hint)
+	
+	if converter is not hint or isinstance(hint, type):  # Other callables which are their own converters are not retained.
+		resolved[hint] = converter
+	
+	return converter
+
+
+def construct(hint):
+	"""Construct the converter of an annotation using the registered factory of the nearest matching type."""
+	
+	origin = getattr(hint, '__origin__', None)
+	kind = hint if origin is None else origin
+	
+	if origin is None and not isinstance(hint, type) and hasattr(hint, '__args__'):  # e.g. `int | None`
+		kind = type(hint)
+	
+	args = getattr(hint, '__args__', None) or ()
+	
+	for name in (qualified(i) for i in getattr(kind, '__mro__', (kind, ))):
+		if name in registry:
+			return registry[name](kind, args)
+	
+	if origin is None and callable(hint):
+		return hint
+	
+	raise TypeError("Unsupported annotation: " + repr(hint))
+
+
+def pure(fn=None, size=1024):
+	"""Mark the decorated converter as pure, permitting memoization of up to `size` results per specification.
+	
+	May be used with or without arguments, e.g. `@pure` or `@pure(size=64)`.  Values must be hashable.
+	"""
+	
+	if fn is None:
+		return lambda fn: pure(fn, size)
+	
+	fn._cmd_pure = size
+	
+	return fn
+
+
+def memoize(converter):
+	"""Return a new memoizing wrapper around the converter if it was marked pure, otherwise the converter itself."""
+	
+	size = getattr(converter, '_cmd_pure', None)
+	
+	if size is None or lru_cache is None or hasattr(converter, 'cache_info'):
+		return converter
+	
+	return lru_cache(size)(converter)
+
+
+@register('typing.Any')
+def untyped(kind, args):
+	return None
+
+
+@register(bool)
+def switch(kind, args):
+	return boolean
+
+
+@register(list, tuple, set, frozenset)
+def sequence(kind, args):
+	"""Comma-separated values, each converted by the converter of the element type, if given."""
+	
+	if len(args) > 1 and args[1] is not Ellipsis:  # A fixed-length tuple of heterogeneous elements.
+		converters = [resolve(i) or (lambda value: value) for i in args]
+		
+		def fixed(value):
+			values = array(value)
+			
+			if len(values) != len(converters):
+				raise ValueError("Expected {0} values, found {1}.".format(len(converters), len(values)))
+			
+			return tuple(convert(i) for convert, i in zip(converters, values))
+		
+		return fixed
+	
+	item = resolve(args[0]) if args else None
+	
+	if kind is list:
+		return array if item is None else lambda value: list(map(item, array(value)))
+	
+	return (lambda value: kind(array(value))) if item is None else lambda value: kind(map(item, array(value)))
+
+
+@register('typing.Union', 'types.UnionType')
+def union(kind, args):
+	"""The converter of the first member accepting the value; `Optional[T]` is the converter of `T`."""
+	
+	converters = [resolve(i) for i in args if i is not type(None)]
+	
+	if len(converters) == 1:
+		return converters[0]
+	
+	def choose(value):
+		for convert in converters:
+			if convert is None:
+				return value
+			
+			try:
+				return convert(value)
+			except (ValueError, TypeError):
+				continue
+		
+		raise ValueError("Unable to convert: " + repr(value))
+	
+	return choose
+
+
+@register('typing.Literal')
+def literal(kind, args):
+	"""One of a fixed set of choices, identified by their textual representation."""
+	
+	choices = dict((type('')(i), i) for i in args)
+	
+	def choose(value):
+		try:
+			return choices[value]
+		except (KeyError, TypeError):
+			raise ValueError("Invalid choice {0!r}, expected one of: {1}".format(value, ", ".join(choices)))
+	
+	return choose
+
+
+@register('enum.Enum')
+def enumeration(kind, args):
+	"""A member of an enumeration, identified by name (in any case) or by the textual representation of its value."""
+	
+	members = dict()
+	
+	for name, member in kind.__members__.items():
+		members[name] = members[name.lower()] = member
+	
+	for member in kind:
+		members.setdefault(type('')(member.value), member)
+	
+	def choose(value):
+		try:
+			return members[value]
+		except (KeyError, TypeError):
+			raise ValueError("Invalid choice {0!r}, expected one of: {1}".format(value, ", ".join(kind.__members__)))
+	
+	return choose
+
+
+@register('decimal.Decimal')
+def decimal(kind, args):
+	"""Arbitrary precision decimal values, failing with a `ValueError` like other numeric types."""
+	
+	from decimal import InvalidOperation
+	
+	def convert(value):
+		try:
+			return kind(value)
+		except InvalidOperation:
+			raise ValueError("Invalid decimal value: " + repr(value))
+	
+	return convert
+
+
+@register('datetime.datetime', 'datetime.date', 'datetime.time')
+def temporal(kind, args):
+	"""ISO 8601 dates, times, and combinations thereof."""
+	
+	if hasattr(kind, 'fromisoformat'):  # Python 3.7 and later.
+		return kind.fromisoformat
+	
+	from datetime import datetime
+	
+	form = {'datetime': '%Y-%m-%dT%H:%M:%S', 'date': '%Y-%m-%d', 'time': '%H:%M:%S'}[kind.__name__]
+	
+	if kind.__name__ == 'datetime':
+		return lambda value: datetime.strptime(value, form)
+	
+	return lambda value: getattr(datetime.strptime(value, form), kind.__name__)()
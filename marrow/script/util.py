@@ -2,22 +2,225 @@
 
 from __future__ import unicode_literals
 
+import os
 import sys
-import types
-import inspect
 
-from textwrap import wrap as wrap_
+from collections import namedtuple
 
 
-__all__ = ['wrap', 'InspectionComplete', 'InspectionFailed', 'getargspec', 'partitionhelp']
+__all__ = ['wrap', 'InspectionComplete', 'InspectionFailed', 'partitionhelp', 'delimited', 'response',
+		'ArgSpec', 'argspec', 'boolean', 'array', 'pathlike', 'numeric', 'vector', 'elementwise', 'invalid', 'failure']
 
 
 # Mac OS X terminal lies, so do others, probably.
 # TODO: Needs testing; works on OS X.
 encoding = sys.getdefaultencoding() if sys.getdefaultencoding() != 'ascii' else 'utf8'
+errors = 'surrogateescape' if sys.version_info >= (3, ) else 'strict'
+
+# A whitespace-separated argument, allowing for quoted spans and backslash escapes.
+token = br'''(?:[^\s'"\\]|\\.|'[^']*'|"(?:[^"\\]|\\.)*")+'''
+
+ArgSpec = namedtuple('ArgSpec', ('args', 'varargs', 'keywords', 'defaults'))
+
+# The `array.array` type codes of numeric typecasts which may be converted in bulk.
+typecodes = {int: 'q' if sys.version_info >= (3, 3) else 'l', float: 'd'}
+converters = dict()  # Sequence conversion callbacks, by typecast; see elementwise.
+
+
+def argspec(fn):
+	"""Return the `ArgSpec` of a Python function or method by reading its code object directly.
+	
+	A lightweight equivalent of `inspect.getargspec`, avoiding the import of `inspect` itself.  Raises `TypeError` for
+	callables lacking a code object, such as the `__init__` of built-in classes.
+	
+	Keyword-only arguments follow the others, with their defaults, as they may only be given by name; those lacking a
+	default can not be represented, and also raise `TypeError`.
+	"""
+	
+	try:
+		code = fn.__code__
+	except AttributeError:
+		raise TypeError("Unsupported callable: " + repr(fn))
+	
+	names = code.co_varnames
+	index = code.co_argcount + getattr(code, 'co_kwonlyargcount', 0)
+	args = list(names[:index])
+	defaults = fn.__defaults__
+	varargs = keywords = None
+	
+	if index > code.co_argcount:
+		given = fn.__kwdefaults__ or dict()
+		required = [i for i in names[code.co_argcount:index] if i not in given]
+		
+		if required:
+			raise TypeError("Keyword-only arguments lacking defaults are unsupported: " + ", ".join(required))
+		
+		defaults = (defaults or ()) + tuple(given[i] for i in names[code.co_argcount:index])
+	
+	if code.co_flags & 0x04:  # CO_VARARGS
+		varargs = names[index]
+		index += 1
+	
+	if code.co_flags & 0x08:  # CO_VARKEYWORDS
+		keywords = names[index]
+	
+	return ArgSpec(args, varargs, keywords, defaults)
+
+
+def boolean(value):
+	"""Convert the given value to a boolean, accepting common textual forms such as "yes", "off", or "1"."""
+	
+	try:
+		value = value.strip().lower()
+	except AttributeError:
+		return bool(value)
+	
+	if value in ('yes', 'y', 'on', 'true', 't', '1'):
+		return True
+	
+	if value in ('no', 'n', 'off', 'false', 'f', '0'):
+		return False
+	
+	raise ValueError("Unable to convert {0!r} to a boolean value.".format(value))
+
+
+def pathlike(cast):
+	"""Determine if the given typecast callback accepts a filesystem path, e.g. to offer filenames when completing."""
+	
+	if getattr(cast, '__name__', None) in ('open', 'file') or getattr(cast, 'pathlike', False) is True:
+		return True
+	
+	return isinstance(cast, type) and any(i.__module__ in ('pathlib', 'pathlib._local') for i in cast.__mro__)
+
+
+def array(value, separator=','):
+	"""Convert the given value to a list, splitting strings on the separator and omitting empty elements."""
+	
+	if value is None:
+		return []
+	
+	if isinstance(value, (bytes, type(''))):
+		value = [i.strip() for i in value.split(separator)]
+	
+	return [i for i in value if i]
+
+
+def numeric(cast):
+	"""Determine if values of the given typecast may be converted in bulk into a compact array, see `vector`."""
+	
+	if cast in typecodes:
+		return True
+	
+	return isinstance(cast, type) and getattr(cast, '__module__', None) == 'numpy'
+
+
+def invalid(values, check, offset=0):
+	"""Return descriptions of each of the values the given callback fails to convert, with its (1-based) position."""
+	
+	failures = []
+	
+	for position, value in enumerate(values, offset + 1):
+		try:
+			check(value)
+		except (ValueError, TypeError, OverflowError):
+			failures.append("{0!r} at position {1}".format(value, position))
+	
+	return failures
+
+
+def failure(cast, failures):
+	"""Return a `ValueError` describing the given failures to convert values to the typecast, as found by `invalid`."""
+	
+	if len(failures) > 10:
+		failures[10:] = ["and {0} more".format(len(failures) - 10)]
+	
+	return ValueError("Unable to convert to {0}: {1}".format(getattr(cast, '__name__', cast), ", ".join(failures)))
+
+
+def vector(values, cast, size=4096):
+	"""Convert the given textual values to a compact array of the numeric typecast in a single pass.
+	
+	Integers and floating point values are packed into an `array.array`; NumPy scalar types (e.g. `numpy.float32`)
+	produce a NumPy array of that type.  Values are consumed from the iterable and packed in chunks of `size`, so
+	that no more than one chunk of them is held at a time.  If any value can not be converted, a `ValueError` is raised
+	identifying every invalid value by its (1-based) position.
+	"""
+	
+	from itertools import islice
+	
+	if cast in typecodes:
+		from array import array
+		
+		code = typecodes[cast]
+		result = array(code)
+		extend = lambda chunk: result.extend(map(cast, chunk))
+		check = lambda value: array(code, [cast(value)])
+		finish = lambda: result
+	
+	else:
+		from numpy import array, concatenate
+		
+		parts = []
+		extend = lambda chunk: parts.append(array(chunk, dtype=cast))
+		check = lambda value: array([value], dtype=cast)
+		finish = lambda: concatenate(parts) if parts else array([], dtype=cast)
+	
+	values = iter(values)
+	failures = []
+	offset = 0
+	
+	while True:
+		chunk = list(islice(values, size))
+		
+		if not chunk:
+			break
+		
+		if not failures:
+			try:
+				extend(chunk)
+				offset += len(chunk)
+				continue
+			except (ValueError, TypeError, OverflowError):
+				pass
+		
+		# Only on failure is each value examined individually, to report all of those invalid at once.
+		failures.extend(invalid(chunk, check, offset))
+		offset += len(chunk)
+	
+	if failures:
+		raise failure(cast, failures)
+	
+	return finish()
+
+
+def elementwise(cast, shared=True):
+	"""Return a callback converting each of a sequence of values to a tuple, reporting all of those invalid at once.
+	
+	Unless otherwise requested, callbacks are shared by all uses of the typecast, which is available as `cast`.
+	"""
+	
+	if shared and cast in converters:
+		return converters[cast]
+	
+	def convert(values):
+		try:
+			return tuple(map(cast, values))
+		except (ValueError, TypeError, OverflowError):
+			failures = invalid(values, cast)
+			if not failures: raise
+			raise failure(cast, failures)
+	
+	convert.cast = cast
+	
+	if shared:
+		converters[cast] = convert
+	
+	return convert
 
 
 def wrap(text, columns=78):
+	from textwrap import wrap as wrap_
+	
 	lines = []
 	
 	if isinstance(text, list):
@@ -72,3 +275,84 @@ def partitionhelp(s):
 		_.append(line)
 	
 	return head, tail
+
+
+def delimited(stream, delimiter='\n', size=65536):
+	"""Lazily yield the delimiter-separated values read from a file-like object, excluding the delimiter."""
+	
+	if delimiter == '\n':
+		for line in stream:
+			yield line[:-1] if line[-1:] == '\n' else line
+		
+		return
+	
+	remainder = ''
+	
+	while True:
+		chunk = stream.read(size)
+		if not chunk: break
+		
+		values = (remainder + chunk).split(delimiter)
+		remainder = values.pop()
+		
+		for value in values:
+			yield value
+	
+	if remainder:
+		yield remainder
+
+
+def response(path):
+	"""Return an iterator over the arguments contained within a response file.
+	
+	The file is memory-mapped rather than read; arguments are decoded one at a time as they are reached.  Files
+	containing a NUL character are NUL-delimited, otherwise arguments are separated by whitespace, allowing for shell
+	quoting and backslash escapes.  Raises `IOError` or `OSError` if the file can not be opened.
+	"""
+	
+	import mmap, stat
+	
+	with open(path, 'rb') as fh:
+		info = os.fstat(fh.fileno())
+		
+		if not stat.S_ISREG(info.st_mode):  # Pipes and devices can not be mapped.
+			return _split(fh.read())
+		
+		if not info.st_size:  # Nor can empty files.
+			return iter(())
+		
+		data = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+	
+	return _split(data)
+
+
+def _split(data):
+	import re, mmap, shlex
+	
+	try:
+		if data.find(b'\0') != -1:
+			start, end = 0, len(data)
+			
+			while start < end:
+				stop = data.find(b'\0', start)
+				if stop == -1: stop = end
+				
+				if stop > start:
+					yield data[start:stop].decode(encoding, errors)
+				
+				start = stop + 1
+			
+			return
+		
+		for match in re.finditer(token, data, re.S):
+			value = match.group()
+			
+			if b"'" in value or b'"' in value or b'\\' in value:
+				yield "".join(shlex.split(value.decode(encoding, errors)))
+				continue
+			
+			yield value.decode(encoding, errors)
+	
+	finally:
+		if isinstance(data, mmap.mmap):
+			data.close()
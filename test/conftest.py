@@ -0,0 +1,22 @@
+# encoding: utf-8
+
+import sys
+
+
+# Modules using syntax or standard library modules unavailable on older interpreters.
+collect_ignore = []
+
+if sys.version_info < (3, ):
+	collect_ignore.append('test_schema.py')
+
+if sys.version_info < (3, 2):
+	collect_ignore.append('test_parallel.py')
+
+if sys.version_info < (3, 3):
+	collect_ignore.append('test_mapped.py')
+
+if sys.version_info < (3, 5):
+	collect_ignore.append('test_async.py')
+
+if sys.version_info < (3, 8):
+	collect_ignore.append('test_typecast.py')
@@ -0,0 +1,66 @@
+# encoding: utf-8
+
+from __future__ import unicode_literals
+
+import os
+import signal
+import asyncio
+
+from unittest import TestCase
+
+from marrow.script.core import Parser
+
+
+async def fetch(count=3):
+	results = await asyncio.gather(*(asyncio.sleep(0, i) for i in range(count)))
+	return sum(results)
+
+
+class Client(object):
+	def __init__(self, host="localhost"):
+		self.host = host
+		self.connected = False
+	
+	def __await__(self):
+		return self.connect().__await__()
+	
+	async def connect(self):
+		await asyncio.sleep(0)
+		self.connected = True
+		return self
+	
+	async def ping(self, times=1):
+		await asyncio.sleep(0)
+		return times if self.connected else -1
+
+
+class TestAsynchronousCommands(TestCase):
+	def test_coroutine_function(self):
+		assert Parser(fetch)(['--count=5']) == 10
+	
+	def test_awaitable_instance_and_method(self):
+		assert Parser(Client)(['ping', '-t', '4']) == 4
+	
+	def test_loop_factory(self):
+		created = []
+		
+		def factory():
+			created.append(asyncio.new_event_loop())
+			return created[-1]
+		
+		assert Parser(Client, loop=factory)(['ping']) == 1
+		assert len(created) == 1  # Shared by the instance and the sub-command.
+		assert created[0].is_closed()
+	
+	def test_interrupt_cancels(self):
+		cleaned = []
+		
+		async def slow():
+			try:
+				os.kill(os.getpid(), signal.SIGINT)
+				await asyncio.sleep(10)
+			finally:
+				cleaned.append(True)
+		
+		assert Parser(slow)() == 130
+		assert cleaned == [True]
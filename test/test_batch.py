@@ -0,0 +1,58 @@
+# encoding: utf-8
+
+from __future__ import unicode_literals, print_function
+
+from json import loads
+from unittest import TestCase
+
+from marrow.script.core import Parser
+from marrow.script.batch import batch
+
+from helper import capture, StringIO
+
+
+def greet(name, loud=False):
+	print(("HELLO " + name.upper()) if loud else ("Hello " + name))
+	return 0 if name != "nobody" else 2
+
+
+class TestBatchExecution(TestCase):
+	def test_plain_batch(self):
+		lines = StringIO("alice\n\n# A comment.\n'bob smith' --loud\n")
+		
+		with capture() as stdout:
+			assert batch(Parser(greet), lines) == 0
+			result = stdout.getvalue()
+		
+		assert result == "Hello alice\nHELLO BOB SMITH\n"
+	
+	def test_json_batch(self):
+		lines = StringIO("alice\nnobody\n--bogus\n")
+		output = StringIO()
+		
+		assert batch(Parser(greet), lines, output, json=True) == 1
+		
+		records = [loads(i) for i in output.getvalue().splitlines()]
+		
+		assert [i['line'] for i in records] == [1, 2, 3]
+		assert [i['status'] for i in records] == [0, 2, 64]
+		assert records[0]['argv'] == ['alice']
+		assert records[0]['stdout'] == "Hello alice\n"
+		assert 'Unknown argument' in records[2]['stdout']
+	
+	def test_malformed_line(self):
+		lines = StringIO('alice\n"bob\ncarol\n')
+		output = StringIO()
+		
+		assert batch(Parser(greet), lines, output, json=True) == 1
+		
+		records = [loads(i) for i in output.getvalue().splitlines()]
+		
+		assert [i['line'] for i in records] == [1, 2, 3]
+		assert [i['status'] for i in records] == [0, 64, 0]
+		assert records[1]['argv'] is None
+		assert 'closing quotation' in records[1]['stderr']
+		
+		with capture() as stdout:
+			assert batch(Parser(greet), StringIO('alice\n"bob\ncarol\n')) == 1
+			assert stdout.getvalue() == "Hello alice\nHello carol\n"
@@ -0,0 +1,112 @@
+# encoding: utf-8
+
+from __future__ import unicode_literals
+
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+
+from unittest import TestCase
+from importlib import import_module
+
+from marrow.script import Lazy
+from marrow.script.core import Parser, Specification
+from marrow.script.cache import describe, load, location, store
+
+
+class Service(object):
+	"""Example service."""
+	
+	def __init__(self, verbose=False):
+		pass
+	
+	def start(self, config=None):
+		"""Start the service."""
+		return 0
+	
+	def stop(self, force=False):
+		return 2 if force else 1
+	
+	remote = Lazy('example.does.not.exist:remote', "A remote command.")
+
+
+class TestPersistentCache(TestCase):
+	def setUp(self):
+		self.directory = tempfile.mkdtemp()
+		self.environ = os.environ.get('XDG_CACHE_HOME')
+		os.environ['XDG_CACHE_HOME'] = self.directory
+	
+	def tearDown(self):
+		if self.environ is None:
+			del os.environ['XDG_CACHE_HOME']
+		else:
+			os.environ['XDG_CACHE_HOME'] = self.environ
+		
+		shutil.rmtree(self.directory)
+	
+	def test_describe(self):
+		tree = describe(Parser(Service))
+		
+		assert sorted(tree) == ['', 'start', 'stop']
+		assert tree['']['commands'] == dict(remote=["A remote command."], start=["Start the service."], stop=[])
+		assert tree['']['flags'] == ['help', 'verbose', 'version']
+		assert tree['stop']['short']['f'] == 'force'
+	
+	def test_persisted_round_trip(self):
+		assert load(Service) is None
+		
+		assert Parser(Service, persist=True)(['stop', '-f']) == 2
+		assert load(Service) is None  # Invocation compiles only the path taken, never describing the whole tree.
+		
+		assert Parser(Service, persist=True).persisted()['stop']['short']['f'] == 'force'
+		assert location(Service).startswith(self.directory)
+		
+		tree = load(Service)
+		assert tree['start']['doc'] == [["Start the service."], []]
+		assert Parser(Service, persist=True).persisted() == tree
+		
+		restored = Specification(vars(Service)['stop'], True, True, tree['stop'])
+		assert restored.short == Parser(Service).compile(Service().stop).short
+		assert restored.doc is None
+	
+	def test_stale_description(self):
+		store(Service, describe(Parser(Service)))
+		
+		with open(location(Service)) as fh:
+			data = json.load(fh)
+		
+		data['fingerprints'][0][2] += 1
+		
+		with open(location(Service), 'w') as fh:
+			json.dump(data, fh)
+		
+		assert load(Service) is None
+	
+	def test_stale_subcommand_module(self):
+		sys.path.insert(0, self.directory)
+		source = os.path.join(self.directory, 'cached_subcommand.py')
+		
+		def write(signature):
+			with open(source, 'w') as fh:
+				fh.write("class Sub(object):\n\tdef run(self, {0}):\n\t\treturn 3 if locals().get('extra') else 0\n".format(
+						signature))
+			
+			sys.modules.pop('cached_subcommand', None)
+			return import_module('cached_subcommand').Sub
+		
+		try:
+			Tool = type(str('Tool'), (object, ), dict(__init__=lambda self: None, sub=write("name='x'")))
+			assert 'e' not in Parser(Tool, persist=True).persisted()['sub run']['short']
+			
+			time.sleep(0.01)
+			Tool.sub = write("name='x', extra=False")  # The abbreviation of extra becomes available.
+			
+			assert load(Tool) is None
+			assert Parser(Tool, persist=True).persisted()['sub run']['short']['e'] == 'extra'
+		
+		finally:
+			sys.path.remove(self.directory)
+			sys.modules.pop('cached_subcommand', None)
@@ -0,0 +1,70 @@
+# encoding: utf-8
+
+from __future__ import unicode_literals
+
+import os
+import subprocess
+
+from io import open
+from unittest import TestCase, skipUnless
+
+from marrow.script import annotate
+from marrow.script.core import Parser
+from marrow.script.complete import generate
+
+
+class Archive(object):
+	"""Manage archives."""
+	
+	def __init__(self, verbose=False, level=1):
+		pass
+	
+	@annotate(output=open)
+	def create(self, path, output=None, force=False):
+		"""Create an archive."""
+		return 0
+	
+	def list(self, name):
+		"""List the contents of an archive."""
+		return 0
+
+
+bash = '/bin/bash' if os.path.exists('/bin/bash') else None
+
+
+class TestCompletion(TestCase):
+	def setUp(self):
+		self.parser = Parser(Archive)
+	
+	def complete(self, *words):
+		script = generate(self.parser, 'bash', 'archive')
+		script += '\nCOMP_WORDS=({0}); COMP_CWORD={1}; __marrow_script_archive; printf "%s\\n" "${{COMPREPLY[@]}}"\n'.format(
+				" ".join("'" + i + "'" for i in ('archive', ) + words), len(words))
+		
+		return subprocess.check_output([bash, '-c', script], cwd=os.path.dirname(__file__)).decode('utf-8').split()
+	
+	def test_unsupported_shell(self):
+		with self.assertRaises(ValueError):
+			generate(self.parser, 'csh')
+	
+	def test_fish(self):
+		script = generate(self.parser, 'fish', 'archive')
+		
+		assert "-a 'create' -d 'Create an archive.'" in script
+		assert "-l 'output' -s o -r -F" in script
+	
+	@skipUnless(bash, "Requires bash.")
+	def test_commands(self):
+		assert self.complete('') == ['create', 'list']
+		assert self.complete('c') == ['create']
+	
+	@skipUnless(bash, "Requires bash.")
+	def test_options(self):
+		assert self.complete('--l') == ['--level']
+		assert self.complete('-v', 'create', '--f') == ['--force']
+		assert self.complete('--level', 'create', '') == ['create', 'list']  # The value of an option is skipped.
+	
+	@skipUnless(bash, "Requires bash.")
+	def test_paths(self):
+		assert 'test_complete.py' in self.complete('create', '--output', 'test_comp')
+		assert self.complete('list', '--help', 'test_comp') == []
@@ -2,12 +2,15 @@
 
 from __future__ import unicode_literals, print_function
 
+import sys
+
 from unittest import TestCase
+from tempfile import NamedTemporaryFile
 
 from marrow.script.core import Parser
-from marrow.script import script, annotate
+from marrow.script import script, annotate, stream
 
-from helper import capture
+from helper import capture, StringIO
 
 
 class TestFunctionalInterface(TestCase):
@@ -157,4 +160,237 @@ class TestFunctionalInterface(TestCase):
 		
 		_ = Parser(kwargs)(['--name=value'])
 		self.assertEquals(_, 1)
-		
\ No newline at end of file
+			
+	def test_specification_caching(self):
+		def cached(name="world"):
+			return 0
+		
+		parser = Parser(cached)
+		spec = parser.compile(cached)
+		
+		assert spec is parser.compile(cached)
+		assert spec is Parser(cached).compile(cached)
+		assert spec is not parser.compile(cached, defaults=False)
+		assert spec.short == dict(h='help', V='version', n='name')
+		assert Parser(cached)(['--name=father']) == 0
+	
+	def test_specification_cache_expires(self):
+		import gc, weakref
+		
+		def cached(name="world"):
+			return 0
+		
+		assert Parser(cached)(['--name=father']) == 0
+		
+		target = weakref.ref(cached)
+		del cached
+		gc.collect()
+		
+		assert target() is None  # Cached specifications must not keep their targets alive.
+	
+	def test__args__long_argument_list(self):
+		def args(*args):
+			return len(args) - 100000
+		
+		assert Parser(args)(['value'] * 100000) == 0
+		assert Parser(args)(['--'] + ['-v'] * 100000) == 0
+	
+	def test__args__equated_terminator(self):
+		def args(*args):
+			return 0 if args == ('value', '-qV') else 1
+		
+		assert Parser(args)(['--=value', '-qV']) == 0  # Short arguments following the terminator are not expanded.
+	
+	def test__short__bundled_and_equated(self):
+		def bundled(verbose=False, quiet=False, name="world"):
+			return 1 if verbose and quiet and name == "father" else 0
+		
+		assert Parser(bundled)(['-vq', '--name=father']) == 1
+		assert Parser(bundled)(['-vqn', 'father']) == 1
+		assert Parser(bundled)(['-vq', '--name']) == 64
+	
+	def test__stream__lazy_argument_list(self):
+		@annotate(values=int)
+		@stream(values=None)
+		def total(label, values, verbose=False):
+			assert not isinstance(values, (list, tuple))
+			return sum(values)
+		
+		assert Parser(total)(['sum']) == 0
+		assert Parser(total)(['-v', 'sum', '1', '2', '3']) == 6
+		assert Parser(total)(iter(['sum', '--', '-4', '5'])) == 1
+		assert Parser(total)(['--bogus', 'sum', '1']) == 64
+	
+	def test__numeric__variable_arguments_converted_in_bulk(self):
+		@annotate(values=float)
+		def mean(label, *values):
+			mean.seen = values
+			return 0
+		
+		assert Parser(mean)(['avg', '--', '1', '2.5', '-4e1']) == 0
+		assert mean.seen == (1.0, 2.5, -40.0)
+		assert all(isinstance(i, float) for i in mean.seen)
+		
+		with capture() as out:
+			assert Parser(mean)(['avg', '1', 'two', '3', '4.0.0']) == 64
+			assert "Invalid values for argument values." in out.getvalue()
+			assert "'two' at position 2, '4.0.0' at position 4" in out.getvalue()
+	
+	def test__numeric__streamed_array(self):
+		@annotate(values=int)
+		@stream(values='\n')
+		def total(values):
+			total.seen = values
+			return 0
+		
+		stdin = sys.stdin
+		
+		try:
+			sys.stdin = StringIO("1\n2\n3\n")
+			assert Parser(total)(['0', '-']) == 0
+			assert total.seen.typecode in ('q', 'l')
+			assert list(total.seen) == [0, 1, 2, 3]
+			
+			values = [str(i) for i in range(10000)]
+			values[4999], values[8999] = 'x', 'y'  # Spanning chunks; each reported by position.
+			sys.stdin = StringIO("\n".join(values))
+			
+			with capture() as out:
+				assert Parser(total)(['-']) == 64
+				assert "'x' at position 5000, 'y' at position 9000" in out.getvalue()
+		
+		finally:
+			sys.stdin = stdin
+	
+	def test__stream__delimited_standard_input(self):
+		@stream(values='\0')
+		def count(values):
+			return len(list(values))
+		
+		stdin = sys.stdin
+		
+		try:
+			sys.stdin = StringIO("a\0b\0c\0")
+			assert Parser(count)() == 3
+			
+			sys.stdin = StringIO("a\0b\0c\0")
+			assert Parser(count)(['x', '-', 'y']) == 5
+		
+		finally:
+			sys.stdin = stdin
+	
+	def test__response__file_expansion(self):
+		def collect(*args):
+			collect.seen = args
+		
+		with NamedTemporaryFile() as quoted, NamedTemporaryFile() as delimited:
+			quoted.write(b"one \"two three\"\n'four' five\\ six\n")
+			quoted.flush()
+			delimited.write(b"a\0b c\0")
+			delimited.flush()
+			
+			assert Parser(collect, responses=True)(['@' + quoted.name, '@' + delimited.name, '@missing']) == 0
+			assert collect.seen == ('one', 'two three', 'four', 'five six', 'a', 'b c', '@missing')
+			
+			assert Parser(collect, responses=True)(['--', '@' + quoted.name]) == 0
+			assert collect.seen == ('@' + quoted.name, )
+			
+			assert Parser(collect)(['@' + quoted.name]) == 0
+			assert collect.seen == ('@' + quoted.name, )
+	
+	def test__response__recursion_rejected(self):
+		def collect(*args):
+			return 0
+		
+		with NamedTemporaryFile() as first, NamedTemporaryFile() as second:
+			first.write(("a @" + second.name + "\n").encode('utf-8'))
+			first.flush()
+			second.write(("b @" + first.name + "\n").encode('utf-8'))
+			second.flush()
+			
+			with capture() as out:
+				assert Parser(collect, responses=True)(['@' + first.name]) == 64
+				assert "Recursive response file: " + first.name in out.getvalue()
+			
+			second.seek(0)
+			second.truncate()
+			second.write(b"b\n")
+			second.flush()
+			
+			assert Parser(collect, responses=True)(['@' + first.name, '@' + second.name]) == 0  # Repetition is fine.
+	
+	def test__help__rendered_once(self):
+		def documented(name="world"):
+			"""Greet someone."""
+			return 0
+		
+		parser = Parser(documented)
+		
+		with capture() as out:
+			assert parser(['--help']) == 64
+			first = out.getvalue()
+		
+		assert first.startswith("Greet someone.\nUsage: ")
+		assert "-n, --name=VAL" in first
+		
+		parser.render = None  # A second request must be served from the rendered cache.
+		
+		with capture() as out:
+			assert parser(['-h']) == 64
+			assert out.getvalue() == first
+	
+	def test__help__rendered_weakly(self):
+		import gc, weakref
+		
+		def documented(name="world"):
+			"""Greet someone."""
+			return 0
+		
+		parser = Parser(documented)
+		
+		with capture():
+			assert parser(['--help']) == 64
+		
+		spec = weakref.ref(parser.compile(documented))
+		del parser, documented
+		gc.collect()
+		
+		assert spec() is None  # The rendered page must not keep the specification alive.
+	
+	def test__help__width_discarded_on_resize(self):
+		import os, signal
+		
+		previous = signal.getsignal(signal.SIGWINCH)
+		
+		try:
+			Parser.watching = False
+			Parser.columns = 42
+			Parser.resizing()
+			os.kill(os.getpid(), signal.SIGWINCH)
+			
+			assert Parser.columns is None
+		
+		finally:
+			signal.signal(signal.SIGWINCH, previous)
+			Parser.watching = False
+	
+	def test__help__subclass_width_discarded_on_resize(self):
+		import os, signal
+		
+		class Custom(Parser):
+			pass
+		
+		previous = signal.getsignal(signal.SIGWINCH)
+		
+		try:
+			Parser.watching = False
+			Parser.resizing()  # The handler is installed once; later classes are registered with it.
+			Custom.columns = 42
+			Custom.resizing()
+			os.kill(os.getpid(), signal.SIGWINCH)
+			
+			assert Custom.columns is None
+		
+		finally:
+			signal.signal(signal.SIGWINCH, previous)
+			Parser.watching = False
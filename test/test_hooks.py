@@ -0,0 +1,96 @@
+# encoding: utf-8
+
+from __future__ import unicode_literals
+
+from unittest import TestCase
+
+from marrow.script import callbacks
+from marrow.script.core import Parser
+
+from helper import capture
+
+
+class Tool(object):
+	def __init__(self, verbose=False):
+		pass
+	
+	def run(self, count=1):
+		return count
+	
+	def fail(self):
+		raise RuntimeError("Failure.")
+
+
+class TestHooks(TestCase):
+	def setUp(self):
+		self.parser = Parser(Tool)
+		self.seen = []
+	
+	def record(self, parser, event, elapsed, *details):
+		assert parser is self.parser
+		assert elapsed is None or elapsed >= 0
+		self.seen.append((event, ) + details)
+	
+	def test_unknown_event(self):
+		with self.assertRaises(ValueError):
+			self.parser.hook('missing', self.record)
+	
+	def test_uninstrumented(self):
+		assert 'expand' not in vars(self.parser)
+		
+		self.parser.hook('expanded', self.record)
+		assert 'expand' in vars(self.parser)
+		assert 'call' not in vars(self.parser)
+	
+	def test_dispatch_events(self):
+		for event in ('expanded', 'transformed', 'entered', 'exited'):
+			self.parser.hook(event, self.record)
+		
+		assert self.parser(['-v', 'run', '--count=3']) == 3
+		
+		events = [i[0] for i in self.seen]
+		assert events == ['expanded', 'transformed', 'expanded', 'entered', 'exited', 'expanded', 'transformed',
+				'entered', 'exited']
+		assert self.seen[1][1:3] == ('verbose', True)
+		assert self.seen[-1][-1] == 3
+		
+		self.parser.unhook('expanded', self.record)
+		del self.seen[:]
+		
+		assert self.parser(['run']) == 1
+		assert 'expanded' not in [i[0] for i in self.seen]
+	
+	def test_built(self):
+		def fresh(name="world"): pass
+		
+		parser = self.parser = Parser(fresh)
+		parser.hook('built', self.record)
+		
+		parser.compile(fresh)
+		parser.compile(fresh)
+		
+		assert len(self.seen) == 1
+		assert self.seen[0][1].target is fresh
+	
+	def test_callback_and_exception(self):
+		fired = []
+		
+		@callbacks(name=lambda value, via: fired.append(value))
+		def greet(name="world"): pass
+		
+		parser = self.parser = Parser(greet)
+		parser.hook('callback', self.record)
+		parser.hook('exception', self.record)
+		
+		assert parser(['--name=x']) == 0
+		assert fired == ['x']
+		assert self.seen[0][:3] == ('callback', 'name', 'x')
+		
+		self.parser = Parser(Tool)
+		self.parser.hook('exception', self.record)
+		
+		with capture():
+			assert self.parser(['fail']) == 64
+		
+		assert self.seen[-1][0] == 'exception'
+		assert isinstance(self.seen[-1][1], RuntimeError)
@@ -0,0 +1,58 @@
+# encoding: utf-8
+
+"""Guard the import-time budget of the package; its import cost is paid on every single invocation."""
+
+from __future__ import unicode_literals
+
+import os
+import sys
+import subprocess
+
+from unittest import TestCase, skipIf
+
+
+# Modules only required for help rendering, logging, schemas, batches, and the like; loaded only when used.
+deferred = {'inspect', 'logging', 'textwrap', 'json', 'shlex', 'mmap', 'marrow.util', 'marrow.schema',
+		'marrow.script.schema', 'marrow.script.batch', 'marrow.script.server'}
+
+# Cumulative microseconds permitted for `import marrow.script`, as reported by `python -X importtime`.
+budget = int(os.environ.get('MARROW_SCRIPT_IMPORT_BUDGET', 50000))
+
+
+def importtime():
+	"""Return a mapping of the modules imported by `marrow.script` to their cumulative import time in microseconds.
+	
+	Output is in post-order, so the tree belonging to `marrow.script` is the run of nested lines preceding it.
+	"""
+	
+	process = subprocess.Popen([sys.executable, '-X', 'importtime', '-c', 'import marrow.script'],
+			stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+	_, stderr = process.communicate()
+	
+	assert process.returncode == 0, stderr
+	
+	tree = {}
+	
+	for line in stderr.decode('utf-8').splitlines():
+		if not line.startswith('import time:') or 'cumulative' in line: continue
+		
+		_, cumulative, name = line[12:].split('|')
+		tree[name.strip()] = int(cumulative)
+		
+		if name[:2] != '  ':  # A top-level import; the end of a tree.
+			if name.strip() == 'marrow.script':
+				return tree
+			
+			tree = {}
+	
+	raise AssertionError("Import of marrow.script not reported.")
+
+
+@skipIf(sys.version_info < (3, 7), "Requires -X importtime, added in Python 3.7.")
+class TestImportBudget(TestCase):
+	def test_deferred_imports(self):
+		imported = set(importtime())
+		assert not deferred & imported, sorted(deferred & imported)
+	
+	def test_import_budget(self):
+		assert importtime()['marrow.script'] <= budget
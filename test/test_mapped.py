@@ -0,0 +1,96 @@
+# encoding: utf-8
+
+from __future__ import unicode_literals
+
+import os
+import struct
+import shutil
+import tempfile
+
+from array import array
+from unittest import TestCase
+
+from marrow.script import annotate
+from marrow.script.core import Parser
+from marrow.script.mapped import Array, mapped
+from marrow.script.util import pathlike
+
+
+def npy(descr, shape, data):
+	"""Construct the content of a version 1.0 NumPy file."""
+	
+	meta = "{{'descr': '{0}', 'fortran_order': False, 'shape': {1!r}, }}".format(descr, shape)
+	meta += " " * (63 - (10 + len(meta)) % 64) + "\n"
+	
+	return b'\x93NUMPY\x01\x00' + struct.pack('<H', len(meta)) + meta.encode('latin1') + data
+
+
+class TestMappedArrays(TestCase):
+	def setUp(self):
+		self.directory = tempfile.mkdtemp()
+	
+	def tearDown(self):
+		shutil.rmtree(self.directory)
+	
+	def write(self, name, content):
+		path = os.path.join(self.directory, name)
+		
+		with open(path, 'wb') as fh:
+			fh.write(content)
+		
+		return path
+	
+	def test_numpy_file(self):
+		path = self.write('data.npy', npy('<f8', (2, 3), array('d', range(6)).tobytes()))
+		values = mapped(path)
+		
+		assert values.readonly
+		assert values.shape == (2, 3)
+		assert values[1, 2] == 5.0
+		assert values.tolist() == [[0.0, 1.0, 2.0], [3.0, 4.0, 5.0]]
+	
+	def test_numpy_unsupported(self):
+		path = self.write('data.npy', npy('<U4', (1, ), b'x' * 16))
+		
+		with self.assertRaises(ValueError):
+			mapped(path)
+		
+		with self.assertRaises(ValueError):
+			mapped(self.write('bogus.npy', b'not numpy'))
+	
+	def test_raw_binary(self):
+		path = self.write('data.bin', array('i', [1, 2, 3]).tobytes())
+		
+		assert Array('i')(path).tolist() == [1, 2, 3]
+		assert Array('i')(self.write('empty.bin', b'')).tolist() == []
+		
+		with self.assertRaises(ValueError):
+			Array('d')(path)
+	
+	def test_delimited(self):
+		assert mapped(self.write('data.csv', b"1,2.5\n\n3,-4\n")).tolist() == [[1.0, 2.5], [3.0, -4.0]]
+		assert Array('q')(self.write('data.tsv', b"1\t2\n3\t4\n")).tolist() == [[1, 2], [3, 4]]
+		
+		with self.assertRaises(ValueError) as context:
+			mapped(self.write('invalid.csv', b"1,2\n3,x\n"))
+		
+		assert "Line 2" in context.exception.args[0]
+		assert "'x' at position 2" in context.exception.args[0]
+		
+		with self.assertRaises(ValueError):
+			mapped(self.write('ragged.csv', b"1,2\n3\n"))
+		
+		assert mapped(self.write('empty.csv', b"")).tolist() == []
+		assert mapped(self.write('blank.tsv', b"\n \n")).tolist() == []
+	
+	def test_argument(self):
+		path = self.write('data.npy', npy('<f8', (3, ), array('d', [1, 2, 3]).tobytes()))
+		
+		@annotate(values=mapped)
+		def total(values):
+			total.seen = values
+			return int(sum(values))
+		
+		assert pathlike(mapped)
+		assert Parser(total)([path]) == 6
+		assert isinstance(total.seen, memoryview)
@@ -2,10 +2,15 @@
 
 from __future__ import unicode_literals
 
+import os
+import sys
+import shutil
+import tempfile
 
 from unittest import TestCase
 
 from marrow.script.core import Parser
+from marrow.script.lazy import Lazy
 
 from helper import capture
 
@@ -32,3 +37,65 @@ class TestSimpleCommandInterface(TestCase):
 	
 	def test__example__executes_fail(self):
 		assert Parser(self.ExampleNoInit)(['fail']) == 1
+	
+	def test__example__options_at_each_level(self):
+		class Nested(object):
+			def __init__(self, verbose=False):
+				self.verbose = verbose
+			
+			def run(self, times=1):
+				return times + (10 if self.verbose else 0)
+		
+		assert Parser(Nested)(['run']) == 1
+		assert Parser(Nested)(['-v', 'run', '-t', '2']) == 12
+		assert Parser(Nested)(['--verbose', 'run', '--times=3']) == 13
+		assert Parser(Nested)(['run', '--verbose']) == 64
+	
+	def test__example__preloaded_specifications(self):
+		class Tree(object):
+			class nested(object):
+				def leaf(self, value=1):
+					return value
+			
+			@staticmethod
+			def static(value=2):
+				return value
+			
+			def method(self, value=3):
+				return value
+		
+		parser = Parser(Tree)
+		parser.preload()
+		
+		assert (True, True) in parser.cache[vars(Tree)['method']]
+		assert (False, True) in parser.cache[Tree.static]
+		assert (True, True) in parser.cache[vars(Tree.nested)['leaf']]
+		assert parser(['method', '-v', '4']) == 4
+		assert parser(['static']) == 2
+	
+	def test__example__lazy_subcommands(self):
+		directory = tempfile.mkdtemp()
+		
+		with open(os.path.join(directory, 'lazy_subcommand_example.py'), 'w') as fh:
+			fh.write("def run(value=1):\n\treturn value\n")
+		
+		sys.path.insert(0, directory)
+		
+		try:
+			class Admin(object):
+				run = Lazy('lazy_subcommand_example:run', "Run the example.")
+			
+			with capture() as stdout:
+				assert Parser(Admin)(['--help']) == 64
+				result = stdout.getvalue()
+			
+			assert 'Run the example.' in result
+			assert 'lazy_subcommand_example' not in sys.modules
+			
+			assert Parser(Admin)(['run', '-v', '5']) == 5
+			assert 'lazy_subcommand_example' in sys.modules
+		
+		finally:
+			sys.path.remove(directory)
+			sys.modules.pop('lazy_subcommand_example', None)
+			shutil.rmtree(directory)
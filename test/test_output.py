@@ -0,0 +1,104 @@
+# encoding: utf-8
+
+from __future__ import unicode_literals
+
+import sys
+import subprocess
+
+from collections import namedtuple
+from unittest import TestCase
+
+from marrow.script import formatted
+from marrow.script.core import Parser
+
+from helper import capture
+
+
+script = """
+import sys
+from marrow.script.core import Parser
+
+def numbers():
+	for i in range(10 ** 9):
+		yield i
+
+sys.exit(Parser(numbers)())
+"""
+
+
+Point = namedtuple('Point', ('x', 'y'))
+
+
+@formatted(default='jsonl')
+def points(count=2):
+	"""Emit some points."""
+	
+	for i in range(count):
+		yield Point(i, i * 2)
+
+
+@formatted()
+def single(name="world"):
+	return dict(name=name, greeting="Hello, " + name + "!")
+
+
+class TestStreamedOutput(TestCase):
+	def test_lines(self):
+		def lines(count=3):
+			return ("line {0}".format(i) for i in range(count))
+		
+		with capture() as out:
+			assert Parser(lines)(['-c', '2']) == 0
+			assert out.getvalue() == "line 0\nline 1\n"
+	
+	def test_values_and_binary(self):
+		def mixed():
+			return [1, b"raw\0", "text"]
+		
+		with capture() as out:
+			assert Parser(mixed)() == 0
+			assert out.getvalue() == "1\nraw\0text\n"
+	
+	def test_exit_status_unaffected(self):
+		assert Parser(lambda: 3)() == 3
+	
+	def test_broken_pipe(self):
+		process = subprocess.Popen([sys.executable, '-c', script], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+		
+		assert process.stdout.readline() == b"0\n"
+		process.stdout.close()
+		
+		assert process.wait() == 141
+		assert process.stderr.read() == b""
+		process.stderr.close()
+
+
+class TestFormattedOutput(TestCase):
+	def run_(self, command, argv):
+		with capture() as out:
+			status = Parser(command)(argv)
+			return status, out.getvalue()
+	
+	def test_default(self):
+		assert self.run_(points, []) == (0, '{"x":0,"y":0}\n{"x":1,"y":2}\n')
+	
+	def test_json(self):
+		assert self.run_(points, ['--format=json', '-c', '3']) == (0, '[\n{"x":0,"y":0},\n{"x":1,"y":2},\n{"x":2,"y":4}\n]\n')
+		assert self.run_(points, ['--format', 'json', '-c', '0']) == (0, '[\n]\n')
+	
+	def test_delimited(self):
+		assert self.run_(points, ['--format=csv']) == (0, 'x,y\n0,0\n1,2\n')
+		assert self.run_(single, ['--format=tsv', '-n', 'a b']) == (0, 'name\tgreeting\na b\tHello, a b!\n')
+	
+	def test_unformatted(self):
+		status, out = self.run_(single, [])
+		
+		assert status == {'name': 'world', 'greeting': 'Hello, world!'}
+		assert out == ''
+	
+	def test_unknown_format(self):
+		status, out = self.run_(single, ['--format=xml'])
+		
+		assert status == 64
+		assert out.startswith("Malformed arguments: Unknown output format: xml")
+		assert "--format=VAL" in out
@@ -0,0 +1,79 @@
+# encoding: utf-8
+
+from __future__ import unicode_literals
+
+import os
+import time
+
+from unittest import TestCase
+
+from marrow.script import parallel
+from marrow.script.core import Parser, ScriptError
+from marrow.script.parallel import cpus
+
+from helper import capture
+
+
+@parallel(pool='process')
+def pid(*items):
+	return "{0}:{1}\n".format(items[0], os.getpid())
+
+
+@parallel()
+def echo(prefix, *items):
+	time.sleep(0.01 * (5 - int(items[0])))  # Later items finish first.
+	return prefix + ",".join(items) + "\n"
+
+
+@parallel(ordered=False, chunk=2)
+def chunked(*items):
+	return ",".join(items) + "\n"
+
+
+@parallel()
+def status(*items):
+	return int(items[0])
+
+
+class TestParallelCommands(TestCase):
+	def test_cpus(self):
+		assert 1 <= cpus() <= (os.cpu_count() or 1)
+	
+	def test_specification(self):
+		spec = Parser(echo).compile(echo)
+		
+		assert 'jobs' in spec.named
+		assert spec.short['j'] == 'jobs'
+		
+		def invalid(name): pass
+		parallel()(invalid)
+		
+		with self.assertRaises(ScriptError):
+			Parser(invalid).compile(invalid)
+	
+	def test_ordered_output(self):
+		with capture() as out:
+			assert Parser(echo)(['-j', '4', '>', '1', '2', '3', '4']) == 0
+			assert out.getvalue() == ">1\n>2\n>3\n>4\n"
+	
+	def test_chunked_unordered_output(self):
+		with capture() as out:
+			assert Parser(chunked)(['--jobs=2', 'a', 'b', 'c']) == 0
+			assert sorted(out.getvalue().splitlines()) == ['a,b', 'c']
+	
+	def test_invalid_jobs(self):
+		with capture() as out:
+			assert Parser(echo)(['--jobs=-1', '>', '1']) == 64
+			assert "--jobs must be positive." in out.getvalue()
+	
+	def test_aggregated_status(self):
+		assert Parser(status)(['0', '3', '1']) == 3
+		assert Parser(status)(['0', '0']) == 0
+	
+	def test_process_pool(self):
+		with capture() as out:
+			assert Parser(pid)(['-j', '2', 'a', 'b', 'c']) == 0
+			lines = out.getvalue().splitlines()
+		
+		assert [i.partition(':')[0] for i in lines] == ['a', 'b', 'c']
+		assert str(os.getpid()) not in [i.partition(':')[2] for i in lines]
@@ -0,0 +1,90 @@
+# encoding: utf-8
+
+from __future__ import unicode_literals
+
+import os
+import sys
+import shutil
+import tempfile
+
+from unittest import TestCase
+
+from marrow.script import mount
+from marrow.script.core import Parser
+from marrow.script.plugin import discover, fingerprint
+
+
+METADATA = "Metadata-Version: 2.1\nName: {0}\nVersion: 1.0\n"
+ENTRY_POINTS = "[example.script.commands]\n{0} = {0}_plugin:run\n"
+MODULE = 'def run(value=1):\n\t"""Run the {0} plugin."""\n\treturn value\n'
+
+
+class TestPluginDiscovery(TestCase):
+	def setUp(self):
+		self.directory = tempfile.mkdtemp()
+		self.packages = os.path.join(self.directory, 'site')
+		os.mkdir(self.packages)
+		sys.path.insert(0, self.packages)
+		
+		self.environ = os.environ.get('XDG_CACHE_HOME')
+		os.environ['XDG_CACHE_HOME'] = os.path.join(self.directory, 'cache')
+		
+		self.install('alpha')
+	
+	def tearDown(self):
+		if self.environ is None:
+			del os.environ['XDG_CACHE_HOME']
+		else:
+			os.environ['XDG_CACHE_HOME'] = self.environ
+		
+		sys.path.remove(self.packages)
+		
+		for name in ('alpha_plugin', 'beta_plugin'):
+			sys.modules.pop(name, None)
+		
+		shutil.rmtree(self.directory)
+	
+	def install(self, name):
+		info = os.path.join(self.packages, name + '-1.0.dist-info')
+		os.mkdir(info)
+		
+		for filename, template in (('METADATA', METADATA), ('entry_points.txt', ENTRY_POINTS)):
+			with open(os.path.join(info, filename), 'w') as fh:
+				fh.write(template.format(name))
+		
+		with open(os.path.join(self.packages, name + '_plugin.py'), 'w') as fh:
+			fh.write(MODULE.format(name))
+	
+	def test_discovery_and_index(self):
+		commands = discover('example.script.commands')
+		
+		assert list(commands) == ['alpha']
+		assert commands['alpha'].__doc__ == "Run the alpha plugin."
+		
+		sys.modules.pop('alpha_plugin')
+		
+		assert list(discover('example.script.commands')) == ['alpha']
+		assert 'alpha_plugin' not in sys.modules  # Served from the index without importing.
+		
+		self.install('beta')
+		
+		assert sorted(discover('example.script.commands')) == ['alpha', 'beta']
+	
+	def test_fingerprint_ignores_other_files(self):
+		current = fingerprint()
+		
+		with open(os.path.join(self.packages, 'unrelated.py'), 'w') as fh:
+			fh.write("")
+		
+		assert fingerprint() == current
+		
+		self.install('beta')
+		
+		assert fingerprint() != current
+	
+	def test_mounting(self):
+		@mount('example.script.commands')
+		class Tool(object):
+			pass
+		
+		assert Parser(Tool)(['alpha', '-v', '7']) == 7
@@ -66,3 +66,65 @@ class TestSpecification(TestCase):
 		assert args == ("Bob Dole", )
 		assert kwargs == dict(severity='!')
 		
+	
+	def test_shared_definitions(self):
+		described = "A label."  # A descriptive annotation; named so as not to be parsed as a forward reference.
+		
+		def first(name, count=1, force=False): pass
+		def second(other, count=1, force=False, label: described = None): pass
+		
+		one = Specification.from_object(first)
+		two = Specification.from_object(second)
+		
+		assert one.name.argument is two.other.argument
+		assert one.count.argument is two.count.argument
+		assert one.force.argument is two.force.argument
+		assert one.count.argument is not one.force.argument
+		assert two.label.description == "A label."
+	
+	def test_internal_names_available(self):
+		def cmd(names, index=0, defaults=None, keyword=False): pass
+		
+		spec = Specification.from_object(cmd)
+		
+		assert tuple(spec.__arguments__) == ('names', 'index', 'defaults', 'keyword')
+		assert spec.names.name == 'names'
+		assert spec.index.argument.default == 0
+		assert spec.defaults.short == 'd'
+		
+		arguments = spec()
+		arguments.names = "x"
+		arguments.index = "2"
+		
+		assert arguments.apply() == (("x", ), dict(index=2, defaults=None, keyword=False))
+	
+	def test_variable_application(self):
+		def variable(name, *args, verbose=False, **kw): pass
+		
+		spec = Specification.from_object(variable)()
+		spec.name = "x"
+		spec.args = (1, 2)
+		spec.verbose = "yes"
+		spec.kw = dict(extra=True)
+		
+		assert spec.apply() == (("x", 1, 2), dict(verbose=True, extra=True))
+	
+	def test_missing_required(self):
+		def required(name): pass
+		
+		with self.assertRaises(TypeError):
+			Specification.from_object(required)().apply()
+	
+	def test_numeric_variable_arguments(self):
+		def total(*values: float): pass
+		
+		spec = Specification.from_object(total)()
+		spec.values = ["1.5", "2", "-3e2"]
+		
+		assert spec.values == (1.5, 2.0, -300.0)
+		assert spec.apply() == ((1.5, 2.0, -300.0), dict())
+		
+		with self.assertRaises(ValueError) as context:
+			spec.values = ["1", "x", "3", "y"]
+		
+		assert "'x' at position 2, 'y' at position 4" in context.exception.args[0]
@@ -0,0 +1,119 @@
+# encoding: utf-8
+
+from __future__ import unicode_literals, print_function
+
+import os
+import stat
+import time
+import signal
+import shutil
+import tempfile
+
+from unittest import TestCase
+
+from marrow.script.core import Parser
+from marrow.script.server import serve, stale
+from marrow.script.client import call
+
+
+def greet(name="world"):
+	print("Hello", name, "from", os.getcwd(), os.environ.get('GREETING'))
+	return 0 if name == "world" else 3
+
+
+def measure():
+	print(Parser.width())
+	return 0
+
+
+def terminal(columns):
+	"""Open a pseudo-terminal of the given width, returning the descriptors of its master and slave ends."""
+	
+	import fcntl, termios, struct
+	
+	master, slave = os.openpty()
+	fcntl.ioctl(slave, termios.TIOCSWINSZ, struct.pack(b'HHHH', 24, columns, 0, 0))
+	
+	return master, slave
+
+
+class Served(TestCase):
+	"""Serve the target command for the duration of each test."""
+	
+	fork = False
+	target = staticmethod(greet)
+	
+	def setUp(self):
+		self.directory = tempfile.mkdtemp()
+		self.path = os.path.join(self.directory, 'socket')
+		self.pid = os.fork()
+		
+		if not self.pid:  # pragma: no cover
+			try:
+				serve(Parser(self.target), self.path, fork=self.fork)
+			finally:
+				os._exit(0)
+		
+		for i in range(200):
+			if os.path.exists(self.path): break
+			time.sleep(0.01)
+	
+	def tearDown(self):
+		os.kill(self.pid, signal.SIGTERM)
+		os.waitpid(self.pid, 0)
+		shutil.rmtree(self.directory)
+
+
+class TestWarmServer(Served):
+	def test_round_trip(self):
+		reader, writer = os.pipe()
+		
+		assert call(self.path, ['--name', 'Bob'], (0, writer, 2), dict(GREETING='hi'), '/') == 3
+		assert call(self.path, [], (0, writer, 2), dict(GREETING='hey'), self.directory) == 0
+		os.close(writer)
+		
+		with os.fdopen(reader) as output:
+			result = output.read()
+		
+		assert result == "Hello Bob from / hi\nHello world from " + self.directory + " hey\n"
+	
+	def test_rejected_request(self):
+		null = os.open(os.devnull, os.O_WRONLY)
+		
+		try:
+			assert call(self.path, [], (0, null, null), dict(), '/nonexistent') == os.EX_USAGE
+			assert call(self.path, [], (0, null, null), dict(), '/') == 0  # The server survived.
+		finally:
+			os.close(null)
+	
+	def test_socket(self):
+		assert stat.S_IMODE(os.stat(self.path).st_mode) == 0o600
+		assert not stale(self.path)  # Listening.
+		
+		other = os.path.join(self.directory, 'file')
+		open(other, 'w').close()
+		
+		with self.assertRaises(OSError):
+			serve(Parser(greet), other)
+		
+		assert os.path.isfile(other)  # Never removed, as it is not a socket.
+
+
+class TestForkServer(TestWarmServer):
+	fork = True
+
+
+class TestTerminalWidth(Served):
+	target = staticmethod(measure)
+	
+	def test_width_of_each_client(self):
+		for columns in (60, 100):  # The width cached for the first client's terminal must not be reused.
+			master, slave = terminal(columns)
+			
+			try:
+				assert call(self.path, [], (0, slave, 2), dict(), '/') == 0
+				assert os.read(master, 64).strip() == str(columns - 1).encode('ascii')
+			finally:
+				os.close(slave)
+				os.close(master)
+
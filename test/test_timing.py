@@ -0,0 +1,65 @@
+# encoding: utf-8
+
+from __future__ import unicode_literals
+
+import os
+import re
+import sys
+import shutil
+import tempfile
+import subprocess
+
+from unittest import TestCase
+
+
+script = """
+import sys
+from marrow.script.core import Parser
+
+class Tool(object):
+	def __init__(self, verbose=False):
+		pass
+	
+	def run(self, name="world"):
+		import time, atexit
+		atexit.register(time.sleep, 0.3)  # Exit handlers registered by the command are measured as teardown.
+		return 3
+
+sys.exit(Parser(Tool)(['-v', 'run', '--name=x']))
+"""
+
+
+class TestTimings(TestCase):
+	def setUp(self):
+		self.directory = tempfile.mkdtemp()
+	
+	def tearDown(self):
+		shutil.rmtree(self.directory)
+	
+	def invoke(self, **environ):
+		env = dict(os.environ, **environ)
+		process = subprocess.Popen([sys.executable, '-c', script], stderr=subprocess.PIPE, env=env)
+		error = process.communicate()[1].decode('utf-8')
+		
+		return process.returncode, error
+	
+	def test_phases(self):
+		status, error = self.invoke(MARROW_SCRIPT_TIMINGS='1')
+		phases = [re.match(r'(.*?)\s+[\d.]+\s+[\d.]+$', i).group(1) for i in error.splitlines()[1:]]
+		
+		assert status == 3
+		assert phases == ["startup and import", "specification", "expand", "arguments", "instantiate Tool",
+				"command", "other", "teardown"]
+		
+		teardown = float(error.splitlines()[-1].split()[1])
+		assert teardown >= 250, teardown
+	
+	def test_profile(self):
+		path = os.path.join(self.directory, 'out.pstats')
+		status, error = self.invoke(MARROW_SCRIPT_PROFILE=path)
+		
+		assert status == 3
+		assert error == ""
+		
+		from pstats import Stats
+		assert Stats(path).total_calls
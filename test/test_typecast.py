@@ -0,0 +1,230 @@
+# encoding: utf-8
+
+from __future__ import unicode_literals
+
+from enum import Enum
+from decimal import Decimal
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, List, Literal, Optional, Tuple, Union
+from unittest import TestCase
+
+from marrow.script import annotate, pure
+from marrow.script.core import Parser, Specification, ScriptError
+from marrow.script.typecast import register, registry, resolve, qualified, memoize
+from marrow.script.timing import memoized
+
+from helper import StringIO, capture
+from marrow.script.util import array, boolean
+
+
+class Colour(Enum):
+	RED = 1
+	GREEN = 'green'
+
+
+class TestResolution(TestCase):
+	def test_inferred_from_default(self):
+		assert resolve() is None
+		assert resolve(None, None) is None
+		assert resolve(None, False) is boolean
+		assert resolve(None, ()) is array
+		assert resolve(None, 27) is int
+		assert resolve(None, Colour.RED)("red") is Colour.RED
+	
+	def test_own_converters(self):
+		assert resolve(int) is int
+		assert resolve(Path) is Path
+		assert resolve(Any) is None
+		
+		def custom(value): return value
+		assert resolve(custom) is custom
+	
+	def test_resolved_once(self):
+		assert resolve(List[int]) is resolve(List[int])
+		assert resolve(Colour) is resolve(Colour)
+	
+	def test_sequences(self):
+		assert resolve(List[int])("1, 2,3") == [1, 2, 3]
+		assert resolve(list)("a,b") == ["a", "b"]
+		assert resolve(Tuple[float, ...])("1,2") == (1.0, 2.0)
+		assert resolve(Tuple[int, str])("1,a") == (1, "a")
+		
+		with self.assertRaises(ValueError):
+			resolve(Tuple[int, str])("1,a,b")
+	
+	def test_unions(self):
+		assert resolve(Optional[int]) is int
+		assert resolve(Union[int, float])("1.5") == 1.5
+		
+		with self.assertRaises(ValueError):
+			resolve(Union[int, float])("x")
+	
+	def test_choices(self):
+		assert resolve(Literal['fast', 'slow'])("fast") == "fast"
+		assert resolve(Literal[1, 2])("2") == 2
+		assert resolve(Colour)("GREEN") is Colour.GREEN
+		assert resolve(Colour)("1") is Colour.RED
+		
+		with self.assertRaises(ValueError):
+			resolve(Colour)("blue")
+		
+		with self.assertRaises(ValueError):
+			resolve(Literal['fast', 'slow'])("medium")
+	
+	def test_values(self):
+		assert resolve(Decimal)("1.10") == Decimal("1.10")
+		assert resolve(date)("2020-02-29") == date(2020, 2, 29)
+		assert resolve(datetime)("2020-02-29T12:30:00") == datetime(2020, 2, 29, 12, 30)
+		
+		with self.assertRaises(ValueError):
+			resolve(Decimal)("x")
+	
+	def test_unsupported(self):
+		with self.assertRaises(TypeError):
+			resolve(42)
+	
+	def test_registration(self):
+		class Celsius(float): pass
+		
+		@register(Celsius)
+		def celsius(kind, args):
+			return lambda value: kind(value.rstrip('C'))
+		
+		try:
+			assert resolve(Celsius)("21C") == 21.0
+		finally:
+			registry.pop(qualified(Celsius))
+	
+	def test_specification(self):
+		described = "A label."  # A descriptive annotation; named so as not to be parsed as a forward reference.
+		
+		def command(when: date, colour: Colour = Colour.RED, tags: List[int] = (), verbose=False, label: described = ""):
+			return 0
+		
+		spec = Specification(command)
+		
+		assert spec.cast['when'] is resolve(date)
+		assert spec.cast['colour'] is resolve(Colour)
+		assert spec.cast['tags'] is resolve(List[int])
+		assert spec.cast['verbose'] is boolean
+		assert spec.cast['label'] is str
+	
+	def test_invocation(self):
+		@annotate(tags=List[int])
+		def command(when: date, colour: Colour = Colour.RED, tags=()):
+			command.seen = when, colour, tags
+			return 0
+		
+		assert Parser(command)(['--colour=green', '--tags=1,2', '2021-01-01']) == 0
+		assert command.seen == (date(2021, 1, 1), Colour.GREEN, [1, 2])
+	
+	def test_keyword_only(self):
+		def command(*items, verbose=False, count: int = 1):
+			command.seen = items, verbose, count
+			return 0
+		
+		assert Parser(command)(['a', '--verbose', '-c', '3', 'b']) == 0
+		assert command.seen == (('a', 'b'), True, 3)
+		
+		def required(*, name): pass
+		
+		with self.assertRaises(ScriptError):
+			Parser(required).compile(required)
+
+
+class TestMemoization(TestCase):
+	def test_impure_unaltered(self):
+		assert memoize(int) is int
+	
+	def test_variable_arguments(self):
+		calls = []
+		
+		@pure(size=2)
+		def host(value):
+			calls.append(value)
+			return value.lower()
+		
+		@annotate(hosts=host)
+		def command(*hosts):
+			command.seen = hosts
+			return 0
+		
+		parser = Parser(command)
+		
+		assert parser(['A', 'b', 'A', 'A', 'c', 'A']) == 0
+		assert command.seen == ('a', 'b', 'a', 'a', 'c', 'a')
+		assert calls == ['A', 'b', 'c']
+		
+		info = parser.stack[-1].cast['hosts'].cache_info()
+		assert (info.hits, info.misses, info.maxsize) == (3, 3, 2)
+		
+		out = StringIO()
+		memoized(parser, out)
+		assert out.getvalue().splitlines()[1].split() == ['hosts', '3', '3', '2']
+	
+	def test_per_specification(self):
+		@pure
+		def twice(value):
+			return int(value) * 2
+		
+		def first(count: twice = 0): return count
+		def second(count: twice = 0): return count
+		
+		one, two = Specification(first).cast['count'], Specification(second).cast['count']
+		
+		assert one is not two
+		assert one.__wrapped__ is two.__wrapped__ is twice
+	
+	def test_schema(self):
+		from marrow.script.schema import Specification as Schema
+		
+		@pure
+		def twice(value):
+			return int(value) * 2
+		
+		described = "Doubled."  # Named so as not to be parsed as a forward reference.
+		
+		def command(count: (twice, described) = 0): pass
+		
+		spec = Schema.from_object(command)
+		arguments = spec()
+		arguments.count = "2"
+		arguments.count = "2"
+		
+		assert arguments.count == 4
+		assert spec.count.description == "Doubled."
+		assert spec.count.transform.cache_info().hits == 1
+	
+	def test_variable_arguments_reported(self):
+		@annotate(values=Decimal)
+		def command(*values):
+			return 0
+		
+		with capture() as out:
+			assert Parser(command)(['1.5', 'x', '2', 'y']) == 64
+			assert "Invalid values for argument values." in out.getvalue()
+			assert "'x' at position 2, 'y' at position 4" in out.getvalue()
+			assert "Uncaught exception" not in out.getvalue()
+	
+	def test_schema_variable_arguments(self):
+		from marrow.script.schema import Specification as Schema
+		
+		@pure
+		def lower(value):
+			if not value: raise ValueError("Empty host.")
+			return value.lower()
+		
+		def command(*hosts: lower): pass
+		
+		spec = Schema.from_object(command)
+		arguments = spec()
+		arguments.hosts = ["A", "b", "A"]
+		
+		assert arguments.apply() == (("a", "b", "a"), dict())
+		assert spec.hosts.transform.cast.cache_info().hits == 1
+		
+		with self.assertRaises(ValueError) as context:
+			arguments.hosts = ["a", ""]
+		
+		assert "'' at position 2" in context.exception.args[0]